@@ -874,6 +874,7 @@ class Agent:
                     "agent_number": self.number,
                     "intervention": intervention,
                     "attachments": message.attachments,
+                    "memory_subdir": self.config.memory_subdir or "default",
                 },
                 agent_name=self.agent_name,
                 context_id=self.context.id
@@ -913,6 +914,7 @@ class Agent:
                 context={
                     "agent_number": self.number,
                     "loop_iteration": self.loop_data.iteration,
+                    "memory_subdir": self.config.memory_subdir or "default",
                 },
                 agent_name=self.agent_name,
                 context_id=self.context.id
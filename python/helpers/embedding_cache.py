@@ -0,0 +1,178 @@
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+
+class EmbeddingCache:
+    """In-process LRU cache of embedding vectors with a time-to-live.
+
+    Keys are SHA-256 digests of ``provider:model:text`` so vectors from
+    different embedding models never collide.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text: str, provider: str = "", model: str = "") -> str:
+        return hashlib.sha256(f"{provider}:{model}:{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, provider: str = "", model: str = "") -> Optional[list[float]]:
+        key = self.make_key(text, provider, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, vector = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return vector
+
+    def put(self, text: str, vector: list[float], provider: str = "", model: str = ""):
+        key = self.make_key(text, provider, model)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(vector))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# shared by all Memory instances in the process
+_default_cache = EmbeddingCache()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    return _default_cache
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that answers repeated texts from an EmbeddingCache.
+
+    Only cache misses are sent to the underlying model, in a single batch,
+    and the results are stitched back in input order.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        provider: str,
+        model: str,
+        cache: EmbeddingCache | None = None,
+    ):
+        self.underlying = underlying
+        self.provider = provider
+        self.model = model
+        self.cache = cache or get_embedding_cache()
+
+    def _lookup(self, texts: List[str]) -> tuple[list, list[int]]:
+        vectors: list = [self.cache.get(t, self.provider, self.model) for t in texts]
+        misses = [i for i, v in enumerate(vectors) if v is None]
+        return vectors, misses
+
+    def _fill(self, texts: List[str], vectors: list, misses: list[int], computed: List[List[float]]):
+        for i, vector in zip(misses, computed):
+            self.cache.put(texts[i], vector, self.provider, self.model)
+            vectors[i] = vector
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, misses = self._lookup(texts)
+        if misses:
+            computed = self.underlying.embed_documents([texts[i] for i in misses])
+            self._fill(texts, vectors, misses, computed)
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, misses = self._lookup(texts)
+        if misses:
+            computed = await self.underlying.aembed_documents([texts[i] for i in misses])
+            self._fill(texts, vectors, misses, computed)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text, self.provider, self.model)
+        if vector is None:
+            vector = self.underlying.embed_query(text)
+            self.cache.put(text, vector, self.provider, self.model)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text, self.provider, self.model)
+        if vector is None:
+            vector = await self.underlying.aembed_query(text)
+            self.cache.put(text, vector, self.provider, self.model)
+        return vector
+
+
+class QueryResultCache:
+    """Similarity-keyed LRU of recent search results (SIM-LRU).
+
+    A lookup hits when a cached query under the same key (filter, threshold,
+    ...) has an embedding within ``max_distance`` cosine distance, so
+    rephrased near-duplicate queries reuse the earlier results. The cache is
+    small, so candidates are compared with a plain matrix product.
+    """
+
+    def __init__(self, maxsize: int = 256, max_distance: float = 0.05):
+        self.maxsize = maxsize
+        self.max_distance = max_distance
+        self._entries: OrderedDict[int, tuple[Hashable, np.ndarray, Any]] = OrderedDict()
+        self._by_key: dict[Hashable, list[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def get(self, vector, key: Hashable) -> Any | None:
+        query = self._normalize(vector)
+        with self._lock:
+            ids = self._by_key.get(key)
+            if not ids:
+                return None
+            matrix = np.stack([self._entries[i][1] for i in ids])
+            sims = matrix @ query
+            best = int(np.argmax(sims))
+            if 1.0 - float(sims[best]) > self.max_distance:
+                return None
+            entry_id = ids[best]
+            self._entries.move_to_end(entry_id)
+            return self._entries[entry_id][2]
+
+    def put(self, vector, key: Hashable, payload: Any):
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (key, self._normalize(vector), payload)
+            self._by_key.setdefault(key, []).append(entry_id)
+            while len(self._entries) > self.maxsize:
+                old_id, (old_key, _, _) = self._entries.popitem(last=False)
+                self._by_key[old_key].remove(old_id)
+                if not self._by_key[old_key]:
+                    del self._by_key[old_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_key.clear()
@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Any, List, Sequence
+from typing import Any, Callable, List, Sequence, Tuple
 from langchain.storage import InMemoryByteStore, LocalFileStore
 from langchain.embeddings import CacheBackedEmbeddings
+from python.helpers.embedding_cache import CachedEmbeddings
 from python.helpers import guids
 
 # from langchain_chroma import Chroma
@@ -18,7 +19,8 @@ from langchain_community.vectorstores.utils import (
 )
 from langchain_core.embeddings import Embeddings
 
-import os, json
+import os, json, ast, operator, itertools
+from functools import lru_cache
 
 import numpy as np
 
@@ -31,14 +33,177 @@ from enum import Enum
 from agent import Agent
 import models
 import logging
-from simpleeval import simple_eval
+from simpleeval import EvalWithCompoundTypes
 
 
 # Raise the log level so WARNING messages aren't shown
 logging.getLogger("langchain_core.vectorstores.base").setLevel(logging.ERROR)
 
 
+# HNSW graph parameters for the memory index
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 100
+# search presets map to HNSW efSearch (candidate list size)
+SEARCH_PRESETS = {"fast": 32, "balanced": 64, "accurate": 128}
+# deleted vectors stay in the graph as tombstones until they make up this
+# share of it, then the graph is rebuilt without them
+HNSW_COMPACT_RATIO = 0.25
+
+
+def create_hnsw_index(dim: int) -> faiss.IndexHNSWFlat:
+    index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.hnsw.efSearch = SEARCH_PRESETS["balanced"]
+    return index
+
+
+def rebuild_hnsw_index(index: faiss.Index, keep: Sequence[int] | None = None):
+    # HNSW graphs do not support removal, so compaction (and migration of
+    # older flat indexes) rebuilds the graph from the stored vectors
+    vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+    new_index = create_hnsw_index(index.d)
+    if vectors is not None:
+        if keep is not None:
+            vectors = vectors[np.asarray(keep, dtype=np.int64)]
+        if len(vectors):
+            new_index.add(vectors)
+    return new_index
+
+
 class MyFaiss(FAISS):
+    # bumped on every persisted change, lets result caches detect stale entries
+    version: int = 0
+    _generations = itertools.count()
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # unique per loaded instance, unlike id() it is never reused after a reload
+        self.generation = next(MyFaiss._generations)
+        # index positions of deleted vectors, with the selector that hides them;
+        # index_to_docstore_id keeps their entries so positions stay contiguous
+        self._set_deleted(set())
+
+    def _set_deleted(self, deleted: set[int]):
+        selector = None
+        if deleted:
+            batch = faiss.IDSelectorBatch(np.fromiter(deleted, dtype=np.int64))
+            # the batch must outlive the Not selector that points to it
+            selector = (batch, faiss.IDSelectorNot(batch))
+        # replaced as a whole so concurrent searches see a consistent pair
+        self._tombstones = (frozenset(deleted), selector)
+
+    @property
+    def deleted(self) -> frozenset[int]:
+        return self._tombstones[0]
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        if not isinstance(self.index, faiss.IndexHNSW):
+            return super().delete(ids, **kwargs)
+        if ids is None:
+            raise ValueError("No ids provided to delete.")
+
+        to_delete = set(ids)
+        deleted = self.deleted
+        positions = [
+            i
+            for i, id_ in self.index_to_docstore_id.items()
+            if id_ in to_delete and i not in deleted
+        ]
+        missing_ids = to_delete.difference(self.index_to_docstore_id[i] for i in positions)
+        if missing_ids:
+            raise ValueError(
+                f"Some specified ids do not exist in the current store. Ids not found: "
+                f"{missing_ids}"
+            )
+
+        self.docstore.delete(list(to_delete))
+        self._set_deleted(deleted.union(positions))
+        if len(self.deleted) > self.index.ntotal * HNSW_COMPACT_RATIO:
+            self.compact()
+        return True
+
+    def compact(self):
+        """Rebuild the HNSW graph without the deleted vectors"""
+        deleted = self.deleted
+        remaining = [
+            (i, id_)
+            for i, id_ in sorted(self.index_to_docstore_id.items())
+            if i not in deleted
+        ]
+        self.index = rebuild_hnsw_index(self.index, [i for i, _ in remaining])
+        self.index_to_docstore_id = {n: id_ for n, (_, id_) in enumerate(remaining)}
+        self._set_deleted(set())
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Callable | dict[str, Any] | None = None,
+        fetch_k: int = 20,
+        preset: str = "balanced",
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        if not isinstance(self.index, faiss.IndexHNSW):
+            return super().similarity_search_with_score_by_vector(
+                embedding, k, filter, fetch_k, **kwargs
+            )
+
+        # efSearch and the tombstone filter go in per-call parameters, the
+        # shared index is never mutated by a search
+        _, selector = self._tombstones
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = SEARCH_PRESETS.get(preset, SEARCH_PRESETS["balanced"])
+        if selector is not None:
+            params.sel = selector[1]
+
+        vector = np.array([embedding], dtype=np.float32)
+        if self._normalize_L2:
+            faiss.normalize_L2(vector)
+        scores, indices = self.index.search(
+            vector, k if filter is None else fetch_k, params=params
+        )
+
+        filter_func = self._create_filter_func(filter) if filter is not None else None
+        docs = []
+        for score, i in zip(scores[0], indices[0]):
+            if i == -1:
+                continue  # fewer matches than requested
+            doc = self.docstore.search(self.index_to_docstore_id[i])
+            if not isinstance(doc, Document):
+                raise ValueError(f"Could not find document for index {i}, got {doc}")
+            if filter_func is None or filter_func(doc.metadata):
+                docs.append((doc, score))
+
+        score_threshold = kwargs.get("score_threshold")
+        if score_threshold is not None:
+            cmp = (
+                operator.ge
+                if self.distance_strategy
+                in (DistanceStrategy.MAX_INNER_PRODUCT, DistanceStrategy.JACCARD)
+                else operator.le
+            )
+            docs = [(doc, score) for doc, score in docs if cmp(score, score_threshold)]
+        return docs[:k]
+
+    def save_local(self, folder_path: str, index_name: str = "index") -> None:
+        super().save_local(folder_path, index_name)
+        # tombstones are not part of the FAISS index file
+        deleted_file = os.path.join(folder_path, f"{index_name}.deleted.json")
+        if self.deleted:
+            files.write_file(deleted_file, json.dumps(sorted(self.deleted)))
+        elif os.path.exists(deleted_file):
+            os.remove(deleted_file)
+
+    @classmethod
+    def load_local(
+        cls, folder_path: str, embeddings: Embeddings, index_name: str = "index", **kwargs: Any
+    ) -> "MyFaiss":
+        db = super().load_local(folder_path, embeddings, index_name, **kwargs)
+        deleted_file = os.path.join(folder_path, f"{index_name}.deleted.json")
+        if os.path.exists(deleted_file):
+            db._set_deleted(set(json.loads(files.read_file(deleted_file))))
+        return db
+
     # override aget_by_ids
     def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
         # return all self.docstore._dict[id] in ids
@@ -160,6 +325,10 @@ class Memory:
         embedder = CacheBackedEmbeddings.from_bytes_store(
             embeddings_model, store, namespace=embeddings_model_id
         )
+        # in-process LRU on top, also covers queries which the store does not cache
+        embedder = CachedEmbeddings(
+            embedder, model_config.provider, model_config.name
+        )
 
         # initial DB and docs variables
         db: MyFaiss | None = None
@@ -195,9 +364,13 @@ class Memory:
                 docs = db.get_all_docs()
                 db = None
 
+            # migrate older flat indexes to HNSW
+            if db and not isinstance(db.index, faiss.IndexHNSW):
+                db.index = rebuild_hnsw_index(db.index)
+
         # DB not loaded, create one
         if not db:
-            index = faiss.IndexFlatIP(len(embedder.embed_query("example")))
+            index = create_hnsw_index(len(embedder.embed_query("example")))
 
             db = MyFaiss(
                 embedding_function=embedder,
@@ -321,7 +494,12 @@ class Memory:
         return self.db.get_by_ids(id)[0]
 
     async def search_similarity_threshold(
-        self, query: str, limit: int, threshold: float, filter: str = ""
+        self,
+        query: str,
+        limit: int,
+        threshold: float,
+        filter: str = "",
+        preset: str = "balanced",
     ):
         comparator = Memory._get_comparator(filter) if filter else None
 
@@ -331,6 +509,9 @@ class Memory:
             k=limit,
             score_threshold=threshold,
             filter=comparator,
+            # candidates fetched before the metadata filter, default 20 clips larger limits
+            fetch_k=max(20, limit * 2),
+            preset=preset,
         )
 
     async def delete_documents_by_query(
@@ -385,6 +566,13 @@ class Memory:
         ids = await self.insert_documents([doc])
         return ids[0]
 
+    async def insert_texts(self, texts: list[str], metadatas: list[dict]):
+        docs = [
+            Document(text, metadata=metadata)
+            for text, metadata in zip(texts, metadatas)
+        ]
+        return await self.insert_documents(docs)
+
     async def insert_documents(self, docs: list[Document]):
         ids = [self._generate_doc_id() for _ in range(len(docs))]
         timestamp = self.get_timestamp()
@@ -420,12 +608,31 @@ class Memory:
     def _save_db_file(db: MyFaiss, memory_subdir: str):
         abs_dir = Memory._abs_db_dir(memory_subdir)
         db.save_local(folder_path=abs_dir)
+        db.version += 1  # every mutation is persisted here
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def _get_comparator(condition: str):
+        # simple equality / membership filters become a native FAISS metadata
+        # filter, anything else is parsed once and evaluated per document
+        try:
+            native = Memory._filter_to_dict(ast.parse(condition, mode="eval").body)
+        except SyntaxError:
+            native = None
+        if native is not None:
+            return native
+        return Memory._eval_comparator(condition)
+
+    @staticmethod
+    def _eval_comparator(condition: str) -> Callable[[dict[str, Any]], Any]:
+        try:
+            parsed = EvalWithCompoundTypes().parse(condition)
+        except SyntaxError:
+            parsed = None  # reported per document, as before
+
         def comparator(data: dict[str, Any]):
             try:
-                result = simple_eval(condition, names=data)
+                result = EvalWithCompoundTypes(names=data).eval(condition, previously_parsed=parsed)
                 return result
             except Exception as e:
                 PrintStyle.error(f"Error evaluating condition: {e}")
@@ -433,6 +640,37 @@ class Memory:
 
         return comparator
 
+    @staticmethod
+    def _filter_to_dict(node: ast.AST) -> dict[str, Any] | None:
+        if isinstance(node, ast.BoolOp):
+            parts = [Memory._filter_to_dict(value) for value in node.values]
+            if any(part is None for part in parts):
+                return None
+            if isinstance(node.op, ast.And):
+                return {"$and": parts}
+            # a missing field fails the whole expression in simple_eval, but only
+            # once it is reached; that matches the dict only if all test one field
+            fields = {field for part in parts for field in part}
+            if len(fields) != 1 or next(iter(fields)).startswith("$"):
+                return None
+            return {"$or": parts}
+
+        if not isinstance(node, ast.Compare) or len(node.ops) != 1:
+            return None
+        left, op, right = node.left, node.ops[0], node.comparators[0]
+        if isinstance(op, ast.Eq):
+            if isinstance(left, ast.Constant) and isinstance(right, ast.Name):
+                left, right = right, left
+            # the dict reads a missing field as None, simple_eval raises instead
+            if isinstance(left, ast.Name) and isinstance(right, ast.Constant) and right.value is not None:
+                return {left.id: {"$eq": right.value}}
+        elif isinstance(op, ast.In):
+            if isinstance(left, ast.Name) and isinstance(right, (ast.List, ast.Tuple)):
+                if all(isinstance(elt, ast.Constant) and elt.value is not None for elt in right.elts):
+                    return {left.id: {"$in": [elt.value for elt in right.elts]}}  # type: ignore
+        # other operators differ from simple_eval on missing fields, keep them there
+        return None
+
     @staticmethod
     def _score_normalizer(val: float) -> float:
         res = 1 - 1 / (1 + np.exp(val))
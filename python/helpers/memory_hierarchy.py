@@ -37,10 +37,15 @@ Features:
 """
 
 import asyncio
+import atexit
+import base64
+import itertools
 import json
+import logging
 import os
+import time
 from collections import defaultdict
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 from typing import Any, Dict, List, Optional, Set, Tuple
@@ -52,6 +57,34 @@ from python.helpers import files
 from python.helpers.print_style import PrintStyle
 from python.helpers.vector_db import VectorDB
 
+# Per-operation messages go to a logger instead of PrintStyle, so the store
+# and retrieve paths do no console or HTML log I/O unless debugging is enabled
+logger = logging.getLogger("agent_zero.memory_hierarchy")
+
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+try:
+    from sklearn.cluster import MiniBatchKMeans
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 class MemoryTier(Enum):
     """Memory hierarchy tiers"""
@@ -61,6 +94,75 @@ class MemoryTier(Enum):
     PROCEDURAL = "procedural"    # Skill-based, solution patterns
 
 
+def quantize_int8(vector: np.ndarray) -> Tuple[bytes, float]:
+    """
+    Quantize an embedding vector to int8 with a per-vector scale.
+    
+    Args:
+        vector: Float embedding vector
+        
+    Returns:
+        Tuple of (int8 bytes, scale) such that vector ~= int8 * scale
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    scale = float(np.max(np.abs(vector))) / 127 if vector.size else 0.0
+    if scale == 0.0:
+        scale = 1.0
+    quantized = np.round(vector / scale).astype(np.int8)
+    return quantized.tobytes(), scale
+
+
+def dequantize_int8(data: bytes, scale: float) -> np.ndarray:
+    """Restore a float32 embedding vector from its int8 quantization"""
+    return np.frombuffer(data, dtype=np.int8).astype(np.float32) * scale
+
+
+def _write_file_atomic(path: str, payload: bytes):
+    """Write a payload with a single write to a temp file, then swap it into place"""
+    tmp_path = f"{path}.tmp"
+    Path(tmp_path).write_bytes(payload)
+    os.replace(tmp_path, path)
+
+
+_CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def _encode_crockford32(value: int) -> str:
+    """Encode a non-negative integer in Crockford base32"""
+    chars = []
+    while True:
+        value, rem = divmod(value, 32)
+        chars.append(_CROCKFORD_ALPHABET[rem])
+        if not value:
+            return "".join(reversed(chars))
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.size:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(scores.size)
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _retention_scores(
+    importances: np.ndarray, access_counts: np.ndarray, ages_days: np.ndarray
+) -> np.ndarray:
+    """Retention score per memory: importance, access frequency and 30-day recency"""
+    return (
+        0.4 * importances +
+        0.3 * np.minimum(access_counts / 10.0, 1.0) +
+        0.3 * np.maximum(0.0, 1.0 - ages_days / 30.0)
+    )
+
+
+if NUMBA_AVAILABLE:
+    _retention_scores = numba.njit(cache=True)(_retention_scores)
+
+
 class MemoryImportance(Enum):
     """Memory importance levels"""
     CRITICAL = 1.0    # Must retain
@@ -87,14 +189,36 @@ class MemoryMetadata:
     agent_name: str = ""
     source_type: str = ""  # "user", "agent", "tool", "system"
     consolidation_score: float = 0.0  # Score for memory consolidation
-    embedding_vector: Optional[List[float]] = None
+    embedding_q: Optional[bytes] = None  # int8-quantized embedding
+    embedding_scale: float = 0.0
+    created_at_ts: float = field(default=0.0, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # POSIX timestamp of created_at, so age math avoids datetime arithmetic
+        self.created_at_ts = self.created_at.timestamp()
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for storage"""
-        data = asdict(self)
-        data['tier'] = self.tier.value
-        data['created_at'] = self.created_at.isoformat()
-        data['last_accessed'] = self.last_accessed.isoformat()
+        # Explicit fields instead of asdict(), which deep-copies every list
+        data = {
+            'tier': self.tier.value,
+            'importance': self.importance,
+            'created_at': self.created_at.isoformat(),
+            'last_accessed': self.last_accessed.isoformat(),
+            'access_count': self.access_count,
+            'tags': self.tags,
+            'keywords': self.keywords,
+            'parent_ids': self.parent_ids,
+            'child_ids': self.child_ids,
+            'related_ids': self.related_ids,
+            'context_id': self.context_id,
+            'agent_name': self.agent_name,
+            'source_type': self.source_type,
+            'consolidation_score': self.consolidation_score,
+        }
+        if self.embedding_q is not None:
+            data['embedding_q'] = base64.b64encode(self.embedding_q).decode('ascii')
+            data['embedding_scale'] = self.embedding_scale
         return data
     
     @classmethod
@@ -103,7 +227,62 @@ class MemoryMetadata:
         data['tier'] = MemoryTier(data['tier'])
         data['created_at'] = datetime.fromisoformat(data['created_at'])
         data['last_accessed'] = datetime.fromisoformat(data['last_accessed'])
+        if data.get('embedding_q') is not None:
+            data['embedding_q'] = base64.b64decode(data['embedding_q'])
+        # Indexes written before quantization stored the raw float vector
+        embedding_vector = data.pop('embedding_vector', None)
+        if embedding_vector is not None:
+            data['embedding_q'], data['embedding_scale'] = quantize_int8(embedding_vector)
         return cls(**data)
+    
+    @classmethod
+    def from_schema(cls, entry: '_MemoryMetadataSchema') -> 'MemoryMetadata':
+        """Create from an entry decoded by msgspec"""
+        embedding_q, embedding_scale = entry.embedding_q, entry.embedding_scale
+        if entry.embedding_vector is not None:
+            embedding_q, embedding_scale = quantize_int8(entry.embedding_vector)
+        return cls(
+            tier=entry.tier,
+            importance=entry.importance,
+            created_at=entry.created_at,
+            last_accessed=entry.last_accessed,
+            access_count=entry.access_count,
+            tags=entry.tags,
+            keywords=entry.keywords,
+            parent_ids=entry.parent_ids,
+            child_ids=entry.child_ids,
+            related_ids=entry.related_ids,
+            context_id=entry.context_id,
+            agent_name=entry.agent_name,
+            source_type=entry.source_type,
+            consolidation_score=entry.consolidation_score,
+            embedding_q=embedding_q,
+            embedding_scale=embedding_scale,
+        )
+
+
+if MSGSPEC_AVAILABLE:
+    class _MemoryMetadataSchema(msgspec.Struct):
+        """Stored layout of MemoryMetadata, decoded natively by msgspec"""
+        tier: MemoryTier
+        importance: float
+        created_at: datetime
+        last_accessed: datetime
+        access_count: int = 0
+        tags: List[str] = []
+        keywords: List[str] = []
+        parent_ids: List[str] = []
+        child_ids: List[str] = []
+        related_ids: List[str] = []
+        context_id: str = ""
+        agent_name: str = ""
+        source_type: str = ""
+        consolidation_score: float = 0.0
+        embedding_q: Optional[bytes] = None  # base64 in JSON
+        embedding_scale: float = 0.0
+        embedding_vector: Optional[List[float]] = None  # pre-quantization indexes
+    
+    _metadata_index_decoder = msgspec.json.Decoder(Dict[str, _MemoryMetadataSchema])
 
 
 @dataclass
@@ -140,6 +319,9 @@ class HierarchicalMemory:
         MemoryTier.PROCEDURAL: 0,    # Permanent
     }
     
+    # Seconds between background writes of changed statistics
+    STATS_FLUSH_INTERVAL = 5.0
+    
     def __init__(self, agent, memory_dir: Optional[str] = None):
         """
         Initialize hierarchical memory system.
@@ -149,16 +331,23 @@ class HierarchicalMemory:
             memory_dir: Directory for memory storage
         """
         self.agent = agent
+        # Fixed for the agent's lifetime, resolved once instead of per store
+        self._agent_context_id = getattr(getattr(agent, 'context', None), 'id', "")
+        self._agent_name = getattr(agent, 'agent_name', "")
         self.memory_dir = memory_dir or files.get_abs_path("memory", "hierarchy")
         os.makedirs(self.memory_dir, exist_ok=True)
         
-        # Separate vector databases for each tier
-        self.tier_dbs: Dict[MemoryTier, VectorDB] = {}
-        self._initialize_tier_dbs()
+        # Shared vector database, memories are tagged with their tier
+        self.vector_db: VectorDB = self._initialize_vector_db()
+        
+        # Memory metadata index, parsed on first access to keep it off the boot path
+        self._metadata_index: Optional[Dict[str, MemoryMetadata]] = None
         
-        # Memory metadata index
-        self.metadata_index: Dict[str, MemoryMetadata] = {}
-        self._load_metadata_index()
+        # Monotonic memory ID source, seeded from the clock so IDs stay unique across restarts
+        self._id_counter = itertools.count(int(time.time() * 1000) << 16)
+        
+        # Stacked embedding vectors per tier, built lazily for batched similarity
+        self._embedding_matrix: Dict[MemoryTier, Tuple[List[str], Optional[np.ndarray]]] = {}
         
         # Consolidation rules
         self.consolidation_rules = ConsolidationRule()
@@ -171,29 +360,47 @@ class HierarchicalMemory:
             "prunings": 0,
         }
         self._load_stats()
+        
+        # Statistics are written behind by a background task, see _mark_stats_dirty
+        self._stats_dirty = False
+        self._stats_flush_task: Optional[asyncio.Task] = None
+        atexit.register(self._save_stats)
     
-    def _initialize_tier_dbs(self):
-        """Initialize vector database for each memory tier"""
-        for tier in MemoryTier:
-            self.tier_dbs[tier] = VectorDB(self.agent, cache=True)
-            PrintStyle(font_color="cyan").print(f"Initialized {tier.value} memory tier")
+    def _initialize_vector_db(self) -> VectorDB:
+        """Initialize the vector database shared by all memory tiers"""
+        vector_db = VectorDB(self.agent, cache=True)
+        logger.debug("Initialized memory tiers: %s", ", ".join(tier.value for tier in MemoryTier))
+        return vector_db
+    
+    @property
+    def metadata_index(self) -> Dict[str, MemoryMetadata]:
+        """Memory metadata index, loaded from disk on first access"""
+        if self._metadata_index is None:
+            self._metadata_index = self._load_metadata_index()
+        return self._metadata_index
     
-    def _load_metadata_index(self):
+    def _load_metadata_index(self) -> Dict[str, MemoryMetadata]:
         """Load memory metadata from disk"""
+        metadata_index: Dict[str, MemoryMetadata] = {}
         index_path = os.path.join(self.memory_dir, "metadata_index.json")
         if os.path.exists(index_path):
             try:
-                with open(index_path, 'r') as f:
-                    data = json.load(f)
-                    for mem_id, meta_dict in data.items():
-                        self.metadata_index[mem_id] = MemoryMetadata.from_dict(meta_dict)
+                with open(index_path, 'rb') as f:
+                    raw = f.read()
+                if MSGSPEC_AVAILABLE:
+                    for mem_id, entry in _metadata_index_decoder.decode(raw).items():
+                        metadata_index[mem_id] = MemoryMetadata.from_schema(entry)
+                else:
+                    for mem_id, meta_dict in json.loads(raw).items():
+                        metadata_index[mem_id] = MemoryMetadata.from_dict(meta_dict)
                 PrintStyle(font_color="green").print(
-                    f"Loaded {len(self.metadata_index)} memory entries"
+                    f"Loaded {len(metadata_index)} memory entries"
                 )
             except Exception as e:
                 PrintStyle(font_color="yellow").print(
                     f"Failed to load metadata index: {e}"
                 )
+        return metadata_index
     
     def _save_metadata_index(self):
         """Save memory metadata to disk"""
@@ -203,8 +410,7 @@ class HierarchicalMemory:
                 mem_id: meta.to_dict() 
                 for mem_id, meta in self.metadata_index.items()
             }
-            with open(index_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            _write_file_atomic(index_path, json.dumps(data, indent=2).encode("utf-8"))
         except Exception as e:
             PrintStyle(font_color="red").print(
                 f"Failed to save metadata index: {e}"
@@ -221,16 +427,30 @@ class HierarchicalMemory:
                 pass
     
     def _save_stats(self):
-        """Save memory statistics"""
+        """Save memory statistics if they changed since the last save"""
+        if not self._stats_dirty:
+            return
         stats_path = os.path.join(self.memory_dir, "stats.json")
         try:
-            with open(stats_path, 'w') as f:
-                json.dump(self.stats, f, indent=2)
+            _write_file_atomic(stats_path, json.dumps(self.stats, indent=2).encode("utf-8"))
+            self._stats_dirty = False
         except Exception as e:
             PrintStyle(font_color="yellow").print(
                 f"Failed to save stats: {e}"
             )
     
+    def _mark_stats_dirty(self):
+        """Flag statistics as changed and make sure a background flush is scheduled"""
+        self._stats_dirty = True
+        if self._stats_flush_task is None or self._stats_flush_task.done():
+            self._stats_flush_task = asyncio.create_task(self._periodic_stats_flush())
+    
+    async def _periodic_stats_flush(self):
+        """Write changed statistics every STATS_FLUSH_INTERVAL seconds until idle"""
+        while self._stats_dirty:
+            await asyncio.sleep(self.STATS_FLUSH_INTERVAL)
+            self._save_stats()
+    
     async def store_memory(
         self,
         content: str,
@@ -258,10 +478,8 @@ class HierarchicalMemory:
         Returns:
             Memory ID
         """
-        import uuid
-        
         # Generate unique ID
-        memory_id = str(uuid.uuid4())[:8]
+        memory_id = _encode_crockford32(next(self._id_counter))
         
         # Create metadata
         now = datetime.now(timezone.utc)
@@ -273,8 +491,8 @@ class HierarchicalMemory:
             tags=tags or [],
             keywords=keywords or [],
             parent_ids=parent_ids or [],
-            context_id=self.agent.context.id if hasattr(self.agent, 'context') else "",
-            agent_name=self.agent.agent_name if hasattr(self.agent, 'agent_name') else "",
+            context_id=self._agent_context_id,
+            agent_name=self._agent_name,
             source_type=source_type,
         )
         
@@ -296,23 +514,26 @@ class HierarchicalMemory:
             metadata=doc_metadata
         )
         
-        # Store in vector DB
-        await self.tier_dbs[tier].insert_documents([doc])
+        # Embed through the cache-backed embeddings so the insert reuses the vector
+        embedding = (await self.vector_db.embeddings.aembed_documents([content]))[0]
+        mem_metadata.embedding_q, mem_metadata.embedding_scale = quantize_int8(embedding)
+        
+        # Store in vector DB, keyed by memory ID
+        await self.vector_db.insert_documents([doc], ids=[memory_id])
         
         # Update metadata index
         self.metadata_index[memory_id] = mem_metadata
+        self._embedding_matrix.pop(tier, None)
         self._save_metadata_index()
         
         # Update statistics
         self.stats["total_memories"] += 1
-        self._save_stats()
+        self._mark_stats_dirty()
         
         # Check capacity and trigger consolidation if needed
         await self._check_tier_capacity(tier)
         
-        PrintStyle(font_color="green").print(
-            f"Stored memory {memory_id} in {tier.value} tier"
-        )
+        logger.debug("Stored memory %s in %s tier", memory_id, tier.value)
         
         return memory_id
     
@@ -340,69 +561,171 @@ class HierarchicalMemory:
             List of (Document, similarity_score, metadata) tuples
         """
         results = []
+        now = datetime.now(timezone.utc)
+        now_ts = now.timestamp()
         
         # Determine which tiers to search
         search_tiers = [tier] if tier else list(MemoryTier)
         
-        for search_tier in search_tiers:
-            # Semantic search in vector DB
-            tier_results = await self.tier_dbs[search_tier].search_by_similarity_threshold(
+        # Rank tiers against their stacked embeddings, or fall back to a single
+        # vector DB search when some memories have no stored embedding
+        tier_matrices = [self._get_embedding_matrix(t) for t in search_tiers]
+        if all(matrix is not None for _, matrix in tier_matrices):
+            query_q, _ = quantize_int8(await self.vector_db.embeddings.aembed_query(query))
+            query_vector = np.frombuffer(query_q, dtype=np.int8)
+            # Rank tiers concurrently off the event loop, the SIMD kernels release the GIL
+            tier_candidates = await asyncio.gather(*[
+                asyncio.to_thread(
+                    self._rank_by_embedding,
+                    query_vector, mem_ids, matrix,
+                    limit * 2,  # Get more candidates
+                    0.6,  # Lower threshold, we'll filter by importance
+                )
+                for mem_ids, matrix in tier_matrices
+                if mem_ids
+            ])
+            candidates = [
+                candidate for ranked in tier_candidates for candidate in ranked
+            ]
+        else:
+            # Semantic search in the shared vector DB, filtered by tier metadata
+            candidates = await self.vector_db.search_by_similarity_threshold(
                 query=query,
                 limit=limit * 2,  # Get more candidates
                 threshold=0.6,  # Lower threshold, we'll filter by importance
+                filter=f"tier == '{tier.value}'" if tier else "",
             )
+        
+        # Enhance with metadata and apply filters
+        for doc, score in candidates:
+            memory_id = doc.metadata.get("id", "")
+            if memory_id not in self.metadata_index:
+                continue
             
-            # Enhance with metadata and apply filters
-            for doc, score in tier_results:
-                memory_id = doc.metadata.get("id", "")
-                if memory_id not in self.metadata_index:
-                    continue
-                
-                mem_metadata = self.metadata_index[memory_id]
-                
-                # Apply importance filter
-                if mem_metadata.importance < importance_threshold:
-                    continue
-                
-                # Apply time range filter
-                if time_range:
-                    start_time, end_time = time_range
-                    if not (start_time <= mem_metadata.created_at <= end_time):
-                        continue
-                
-                # Apply tag filter
-                if tags and not any(tag in mem_metadata.tags for tag in tags):
+            mem_metadata = self.metadata_index[memory_id]
+            
+            # Apply importance filter
+            if mem_metadata.importance < importance_threshold:
+                continue
+            
+            # Apply time range filter
+            if time_range:
+                start_time, end_time = time_range
+                if not (start_time <= mem_metadata.created_at <= end_time):
                     continue
-                
-                # Update access statistics
-                mem_metadata.access_count += 1
-                mem_metadata.last_accessed = datetime.now(timezone.utc)
-                
-                # Calculate combined score
-                recency_weight = 0.2
-                importance_weight = 0.3
-                similarity_weight = 0.5
-                
-                age_days = (datetime.now(timezone.utc) - mem_metadata.created_at).days
-                recency_score = max(0, 1.0 - (age_days / 30))  # Decay over 30 days
-                
-                combined_score = (
-                    similarity_weight * score +
-                    importance_weight * mem_metadata.importance +
-                    recency_weight * recency_score
-                )
-                
-                results.append((doc, combined_score, mem_metadata))
-        
-        # Sort by combined score and limit
-        results.sort(key=lambda x: x[1], reverse=True)
-        results = results[:limit]
+            
+            # Apply tag filter
+            if tags and not any(tag in mem_metadata.tags for tag in tags):
+                continue
+            
+            # Update access statistics
+            mem_metadata.access_count += 1
+            mem_metadata.last_accessed = now
+            
+            # Calculate combined score
+            recency_weight = 0.2
+            importance_weight = 0.3
+            similarity_weight = 0.5
+            
+            age_days = (now_ts - mem_metadata.created_at_ts) * (1 / 86400)
+            recency_score = max(0, 1.0 - (age_days / 30))  # Decay over 30 days
+            
+            combined_score = (
+                similarity_weight * score +
+                importance_weight * mem_metadata.importance +
+                recency_weight * recency_score
+            )
+            
+            results.append((doc, combined_score, mem_metadata))
+    
+        # Select the top results by combined score
+        scores = np.fromiter((r[1] for r in results), dtype=np.float64, count=len(results))
+        results = [results[i] for i in _top_k_indices(scores, limit)]
         
         # Save updated metadata
         self._save_metadata_index()
         
         return results
     
+    def _get_embedding_matrix(self, tier: MemoryTier) -> Tuple[List[str], Optional[np.ndarray]]:
+        """
+        Get the stacked int8 embedding matrix of a tier.
+        
+        The matrix is None when some memory in the tier has no embedding, so
+        callers can fall back to the vector DB search. Per-vector scales are
+        dropped because cosine similarity is invariant to them.
+        
+        Args:
+            tier: Tier to stack
+            
+        Returns:
+            Tuple of (memory IDs, int8 matrix with one row per memory)
+        """
+        cached = self._embedding_matrix.get(tier)
+        if cached is not None:
+            return cached
+        
+        mem_ids = []
+        vectors = []
+        complete = True
+        for mem_id, meta in self.metadata_index.items():
+            if meta.tier != tier:
+                continue
+            if meta.embedding_q is None:
+                complete = False
+                break
+            mem_ids.append(mem_id)
+            vectors.append(meta.embedding_q)
+        
+        if complete:
+            matrix = (
+                np.frombuffer(b"".join(vectors), dtype=np.int8).reshape(len(vectors), -1)
+                if vectors else np.empty((0, 0), dtype=np.int8)
+            )
+            cached = (mem_ids, matrix)
+        else:
+            cached = ([], None)
+        self._embedding_matrix[tier] = cached
+        return cached
+    
+    @staticmethod
+    def _cosine_similarity(query_vector: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Cosine similarity of one query vector against every row of an int8 matrix"""
+        if SIMSIMD_AVAILABLE:
+            distances = np.asarray(
+                simsimd.cdist(query_vector[None, :], matrix, metric="cosine")
+            ).ravel()
+            return 1.0 - distances
+        query_vector = query_vector.astype(np.float32)
+        matrix = matrix.astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+        return (matrix @ query_vector) / np.maximum(norms, 1e-12)
+    
+    def _rank_by_embedding(
+        self,
+        query_vector: np.ndarray,
+        mem_ids: List[str],
+        matrix: np.ndarray,
+        limit: int,
+        threshold: float,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Rank a tier's memories by embedding similarity to the query.
+        
+        Scores use the same (1 + cos) / 2 normalization as the vector DB so
+        thresholds stay comparable across both retrieval paths.
+        
+        Returns:
+            List of (Document, similarity_score) tuples, best first
+        """
+        scores = np.clip((1.0 + self._cosine_similarity(query_vector, matrix)) / 2, 0.0, 1.0)
+        order = _top_k_indices(scores, limit)
+        scores_by_id = {
+            mem_ids[i]: float(scores[i]) for i in order if scores[i] >= threshold
+        }
+        docs = self.vector_db.db.get_by_ids(list(scores_by_id))
+        return [(doc, scores_by_id[doc.metadata["id"]]) for doc in docs]
+    
     async def consolidate_memories(self, tier: MemoryTier):
         """
         Consolidate memories in a tier by merging similar ones.
@@ -410,9 +733,7 @@ class HierarchicalMemory:
         Args:
             tier: Tier to consolidate
         """
-        PrintStyle(font_color="cyan").print(
-            f"Starting memory consolidation for {tier.value} tier"
-        )
+        logger.debug("Starting memory consolidation for %s tier", tier.value)
         
         # Get all memories in this tier
         tier_memories = [
@@ -431,17 +752,21 @@ class HierarchicalMemory:
             )
         ]
         
-        PrintStyle(font_color="yellow").print(
-            f"Found {len(consolidation_candidates)} consolidation candidates"
-        )
+        logger.debug("Found %d consolidation candidates", len(consolidation_candidates))
         
-        # Cluster similar memories
-        # TODO: Implement actual clustering algorithm
-        # For now, we'll just mark high-value memories for promotion
+        # Cluster similar memories and merge near-duplicates
+        if self.consolidation_rules.consolidation_strategy == "merge":
+            merged_ids = await self._merge_similar_memories(tier, consolidation_candidates)
+            consolidation_candidates = [
+                (mem_id, meta)
+                for mem_id, meta in consolidation_candidates
+                if mem_id not in merged_ids
+            ]
         
+        now_ts = datetime.now(timezone.utc).timestamp()
         for mem_id, meta in consolidation_candidates:
             # Calculate consolidation score
-            age_days = (datetime.now(timezone.utc) - meta.created_at).days
+            age_days = (now_ts - meta.created_at_ts) * (1 / 86400)
             if age_days >= self.consolidation_rules.age_threshold_days:
                 # Promote to higher tier if appropriate
                 if tier == MemoryTier.WORKING and meta.importance >= 0.7:
@@ -451,7 +776,81 @@ class HierarchicalMemory:
                     await self._promote_memory(mem_id, MemoryTier.SEMANTIC)
         
         self.stats["consolidations"] += 1
-        self._save_stats()
+        self._mark_stats_dirty()
+    
+    async def _merge_similar_memories(
+        self,
+        tier: MemoryTier,
+        candidates: List[Tuple[str, MemoryMetadata]],
+    ) -> Set[str]:
+        """
+        Cluster candidate memories by embedding and merge near-duplicates.
+        
+        Candidates are grouped with mini-batch k-means over their L2-normalized
+        embeddings. Within each cluster, every memory whose cosine similarity to
+        a more important member exceeds the consolidation similarity threshold
+        is merged into it: its ID is linked via related_ids and it is removed.
+        
+        Args:
+            tier: Tier being consolidated
+            candidates: (memory ID, metadata) pairs eligible for consolidation
+            
+        Returns:
+            IDs of the memories that were merged away
+        """
+        candidates = [
+            (mem_id, meta) for mem_id, meta in candidates
+            if meta.embedding_q is not None
+        ]
+        if len(candidates) < 2:
+            return set()
+        
+        emb_matrix = np.stack([
+            dequantize_int8(meta.embedding_q, meta.embedding_scale)
+            for _, meta in candidates
+        ])
+        emb_matrix /= np.maximum(np.linalg.norm(emb_matrix, axis=1, keepdims=True), 1e-12)
+        
+        n_clusters = max(2, len(candidates) // 20)
+        if SKLEARN_AVAILABLE and len(candidates) > n_clusters:
+            labels = MiniBatchKMeans(
+                n_clusters=n_clusters, batch_size=256, n_init=3, random_state=0
+            ).fit_predict(emb_matrix)
+        else:
+            labels = np.zeros(len(candidates), dtype=np.int32)
+        
+        threshold = self.consolidation_rules.similarity_threshold
+        merged_ids: Set[str] = set()
+        for label in np.unique(labels):
+            members = np.flatnonzero(labels == label)
+            if len(members) < 2:
+                continue
+            # Most important first, so each memory can only merge into a better one
+            members = sorted(members, key=lambda i: candidates[i][1].importance, reverse=True)
+            similarities = emb_matrix[members] @ emb_matrix[members].T
+            keepers: List[int] = []
+            for pos, idx in enumerate(members):
+                winner = next(
+                    (k for k in keepers if similarities[pos, k] >= threshold), None
+                )
+                if winner is None:
+                    keepers.append(pos)
+                    continue
+                keeper_id, keeper_meta = candidates[members[winner]]
+                loser_id, loser_meta = candidates[idx]
+                keeper_meta.related_ids.append(loser_id)
+                keeper_meta.access_count += loser_meta.access_count
+                merged_ids.add(loser_id)
+        
+        if merged_ids:
+            for mem_id in merged_ids:
+                del self.metadata_index[mem_id]
+            await self.vector_db.delete_documents_by_ids(list(merged_ids))
+            self._embedding_matrix.pop(tier, None)
+            self._save_metadata_index()
+            logger.debug("Merged %d similar memories in %s tier", len(merged_ids), tier.value)
+        
+        return merged_ids
     
     async def _promote_memory(self, memory_id: str, target_tier: MemoryTier):
         """
@@ -469,17 +868,20 @@ class HierarchicalMemory:
         
         # Update tier
         meta.tier = target_tier
+        self._embedding_matrix.pop(old_tier, None)
+        self._embedding_matrix.pop(target_tier, None)
         
-        # TODO: Move document between vector DBs
-        # For now, just update metadata
+        # Retag the stored document, all tiers share one vector DB
+        for doc in self.vector_db.db.get_by_ids([memory_id]):
+            doc.metadata["tier"] = target_tier.value
         
-        PrintStyle(font_color="green").print(
-            f"Promoted memory {memory_id} from {old_tier.value} to {target_tier.value}"
+        logger.debug(
+            "Promoted memory %s from %s to %s", memory_id, old_tier.value, target_tier.value
         )
         
         self.stats["promotions"] += 1
         self._save_metadata_index()
-        self._save_stats()
+        self._mark_stats_dirty()
     
     async def _check_tier_capacity(self, tier: MemoryTier):
         """
@@ -513,39 +915,37 @@ class HierarchicalMemory:
         ]
         
         # Calculate retention score
-        now = datetime.now(timezone.utc)
-        scored_memories = []
-        
-        for mem_id, meta in tier_memories:
-            age_days = (now - meta.created_at).days
-            recency_score = max(0, 1.0 - (age_days / 30))
-            
-            retention_score = (
-                0.4 * meta.importance +
-                0.3 * min(meta.access_count / 10, 1.0) +
-                0.3 * recency_score
-            )
-            
-            scored_memories.append((mem_id, retention_score))
-        
-        # Sort by retention score
-        scored_memories.sort(key=lambda x: x[1], reverse=True)
+        now_ts = datetime.now(timezone.utc).timestamp()
+        count = len(tier_memories)
+        importances = np.fromiter(
+            (meta.importance for _, meta in tier_memories), dtype=np.float64, count=count
+        )
+        access_counts = np.fromiter(
+            (meta.access_count for _, meta in tier_memories), dtype=np.float64, count=count
+        )
+        ages_days = np.fromiter(
+            ((now_ts - meta.created_at_ts) * (1 / 86400) for _, meta in tier_memories),
+            dtype=np.float64,
+            count=count,
+        )
+        scores = _retention_scores(importances, access_counts, ages_days)
         
         # Keep top N, archive or delete the rest
-        to_prune = scored_memories[target_size:]
+        keep = np.zeros(count, dtype=bool)
+        keep[_top_k_indices(scores, target_size)] = True
+        to_prune = [tier_memories[i][0] for i in np.flatnonzero(~keep)]
         
-        for mem_id, score in to_prune:
+        for mem_id in to_prune:
             # Archive low-value memories
             # TODO: Implement actual archival
             del self.metadata_index[mem_id]
             self.stats["prunings"] += 1
+        self._embedding_matrix.pop(tier, None)
         
-        PrintStyle(font_color="yellow").print(
-            f"Pruned {len(to_prune)} memories from {tier.value} tier"
-        )
+        logger.debug("Pruned %d memories from %s tier", len(to_prune), tier.value)
         
         self._save_metadata_index()
-        self._save_stats()
+        self._mark_stats_dirty()
     
     async def get_memory_summary(self) -> Dict[str, Any]:
         """
@@ -562,27 +962,26 @@ class HierarchicalMemory:
         }
         
         # Count by tier
+        tier_counts = defaultdict(int)
+        for meta in self.metadata_index.values():
+            tier_counts[meta.tier] += 1
         for tier in MemoryTier:
-            count = sum(
-                1 for meta in self.metadata_index.values()
-                if meta.tier == tier
-            )
-            summary["by_tier"][tier.value] = count
-        
-        # Count by importance
-        importance_ranges = [
-            ("critical", 0.9, 1.0),
-            ("high", 0.7, 0.9),
-            ("medium", 0.4, 0.7),
-            ("low", 0.0, 0.4),
-        ]
+            summary["by_tier"][tier.value] = tier_counts[tier]
         
-        for label, min_imp, max_imp in importance_ranges:
-            count = sum(
-                1 for meta in self.metadata_index.values()
-                if min_imp <= meta.importance < max_imp
-            )
-            summary["by_importance"][label] = count
+        # Count by importance (low, medium, high, critical) in a single pass
+        importances = np.fromiter(
+            (meta.importance for meta in self.metadata_index.values()),
+            dtype=np.float64,
+            count=len(self.metadata_index),
+        )
+        counts, _ = np.histogram(importances, bins=[0.0, 0.4, 0.7, 0.9, 1.01])
+        low, medium, high, critical = counts.tolist()
+        summary["by_importance"] = {
+            "critical": critical,
+            "high": high,
+            "medium": medium,
+            "low": low,
+        }
         
         return summary
 
@@ -3,21 +3,171 @@ Memory Management MCP Server for Agent Zero
 Provides tools for managing memories, knowledge base, and agent rules
 """
 
+import asyncio
+import atexit
 import os
 import json
+import threading
+from functools import lru_cache
 from typing import Annotated, Literal, Optional, List, Dict, Any
 from pydantic import Field, BaseModel
 from fastmcp import FastMCP
 
 from python.helpers.memory import Memory, get_memory_subdir_abs
+from python.helpers.embedding_cache import QueryResultCache
 from python.helpers import dotenv, files
 from python.helpers.print_style import PrintStyle
+from python.helpers.strings import sanitize_string
 from langchain_core.documents import Document
 from agent import Agent, AgentContext
 from initialize import initialize_agent
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 _PRINTER = PrintStyle(italic=True, font_color="cyan", padding=False)
 
+# Memory handles per subdir, shared by all tool calls
+_SUBDIR_CACHE: dict[str, Memory] = {}
+_SUBDIR_LOCK = asyncio.Lock()
+
+
+async def _get_memory(memory_subdir: str) -> Memory:
+    memory = _SUBDIR_CACHE.get(memory_subdir)
+    # Memory.reload swaps the shared db, follow it instead of serving a stale handle
+    if memory is not None and Memory.index.get(memory_subdir) is memory.db:
+        return memory
+    async with _SUBDIR_LOCK:
+        memory = _SUBDIR_CACHE.get(memory_subdir)
+        if memory is None or Memory.index.get(memory_subdir) is not memory.db:
+            memory = await Memory.get_by_subdir(memory_subdir)
+            _SUBDIR_CACHE[memory_subdir] = memory
+        return memory
+
+
+@lru_cache(maxsize=256)
+def _kn_path(kn_subdir: str, area: str) -> str:
+    return files.get_abs_path("knowledge", kn_subdir, area)
+
+
+@lru_cache(maxsize=256)
+def _rules_path(profile: str) -> str:
+    return files.get_abs_path("agents", profile, "rules.json")
+
+
+# directories already created by this process, skips the makedirs stat
+_KNOWN_DIRS: set[str] = set()
+
+
+def _ensure_dir(path: str):
+    if path not in _KNOWN_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _KNOWN_DIRS.add(path)
+
+
+# Recent search results, matched by query embedding similarity
+SEARCH_CACHE_MIN_LIMIT = 20
+_SEARCH_CACHE = QueryResultCache(maxsize=256, max_distance=0.05)
+
+
+# Parsed rules.json per file, reused while the file's mtime is unchanged
+_RULES_CACHE: dict[str, tuple[int, dict]] = {}
+_RULES_LOCKS: dict[str, threading.Lock] = {}
+
+
+def _rules_lock(rules_file: str) -> threading.Lock:
+    return _RULES_LOCKS.setdefault(rules_file, threading.Lock())
+
+
+def _load_rules(rules_file: str) -> dict:
+    try:
+        mtime = os.stat(rules_file).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = _RULES_CACHE.get(rules_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(rules_file, "rb") as f:
+        data = f.read()
+    rules = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+    _RULES_CACHE[rules_file] = (mtime, rules)
+    return rules
+
+
+# files above this size are dropped from the page cache after writing
+_FADVISE_THRESHOLD = 1 << 20
+
+
+def _write_text_atomic(path: str, content: str):
+    # write to a temp file and swap it in, readers never see a partial file
+    data = content.encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb", buffering=1 << 20) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        if len(data) > _FADVISE_THRESHOLD and hasattr(os, "posix_fadvise"):
+            # large knowledge blobs are rarely re-read, keep hot pages cached instead
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    os.replace(tmp_path, path)
+
+
+def _dump_rules(rules: dict) -> str:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(rules, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(rules, indent=2)
+
+
+def _save_rules(rules_file: str, rules: dict):
+    _write_text_atomic(rules_file, _dump_rules(rules))
+    _RULES_CACHE[rules_file] = (os.stat(rules_file).st_mtime_ns, rules)
+
+
+# Single rule saves are buffered briefly so a burst becomes one file write
+RULES_WRITE_DELAY = 0.05
+_RULES_PENDING: dict[str, dict[str, dict]] = {}
+_RULES_FLUSH_TASKS: dict[str, asyncio.Task] = {}
+
+
+def _flush_rules_file(rules_file: str) -> int:
+    with _rules_lock(rules_file):
+        pending = _RULES_PENDING.pop(rules_file, None)
+        if not pending:
+            return 0
+        rules = dict(_load_rules(rules_file))
+        rules.update(pending)
+        _save_rules(rules_file, rules)
+        return len(pending)
+
+
+def _flush_all_rules() -> int:
+    return sum(_flush_rules_file(rules_file) for rules_file in list(_RULES_PENDING))
+
+
+atexit.register(_flush_all_rules)
+
+
+async def _flush_rules_later(rules_file: str):
+    await asyncio.sleep(RULES_WRITE_DELAY)
+    _RULES_FLUSH_TASKS.pop(rules_file, None)
+    try:
+        _flush_rules_file(rules_file)
+    except Exception as e:
+        _PRINTER.print(f"Error writing rules file {rules_file}: {e}")
+
+
+def _queue_rule(rules_file: str, rule_name: str, rule: dict):
+    with _rules_lock(rules_file):
+        _RULES_PENDING.setdefault(rules_file, {})[rule_name] = rule
+    if rules_file not in _RULES_FLUSH_TASKS:
+        _RULES_FLUSH_TASKS[rules_file] = asyncio.create_task(
+            _flush_rules_later(rules_file)
+        )
+
+
 # Initialize MCP server for memory management
 memory_mcp = FastMCP(
     name="Agent Zero Memory Manager",
@@ -44,6 +194,14 @@ class MemoryError(BaseModel):
     error: str = Field(description="Error message")
 
 
+class MemoryItem(BaseModel):
+    content: str = Field(description="The memory content to save")
+    metadata: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Optional metadata for the memory (e.g., tags, category, importance)",
+    )
+
+
 @memory_mcp.tool(
     name="save_memory",
     description="Save a memory to the vector database with optional metadata",
@@ -64,7 +222,7 @@ async def save_memory(
         _PRINTER.print(f"Saving memory to subdir: {memory_subdir or 'default'}")
         
         mem_subdir = memory_subdir or "default"
-        memory = await Memory.get_by_subdir(mem_subdir)
+        memory = await _get_memory(mem_subdir)
         
         mem_metadata = metadata or {}
         mem_metadata["area"] = mem_metadata.get("area", Memory.Area.MAIN.value)
@@ -80,6 +238,46 @@ async def save_memory(
         return MemoryError(error=str(e))
 
 
+@memory_mcp.tool(
+    name="save_memories_batch",
+    description="Save multiple memories to the vector database in a single batch",
+)
+async def save_memories_batch(
+    items: Annotated[
+        List[MemoryItem],
+        Field(description="Memories to save, each with content and optional metadata"),
+    ],
+    memory_subdir: Annotated[
+        Optional[str],
+        Field(description="Memory subdirectory to use (default: 'default')"),
+    ] = None,
+) -> MemoryResponse | MemoryError:
+    """Save multiple memories with one embedding batch and one database write"""
+    try:
+        _PRINTER.print(f"Saving {len(items)} memories to subdir: {memory_subdir or 'default'}")
+        
+        mem_subdir = memory_subdir or "default"
+        memory = await _get_memory(mem_subdir)
+        
+        contents = []
+        metadatas = []
+        for item in items:
+            mem_metadata = item.metadata or {}
+            mem_metadata["area"] = mem_metadata.get("area", Memory.Area.MAIN.value)
+            contents.append(item.content)
+            metadatas.append(mem_metadata)
+        
+        doc_ids = await memory.insert_texts(contents, metadatas)
+        
+        return MemoryResponse(
+            message=f"Saved {len(doc_ids)} memories",
+            data={"ids": doc_ids, "count": len(doc_ids)}
+        )
+    except Exception as e:
+        _PRINTER.print(f"Error saving memories: {e}")
+        return MemoryError(error=str(e))
+
+
 @memory_mcp.tool(
     name="search_memories",
     description="Search memories using semantic similarity",
@@ -96,20 +294,35 @@ async def search_memories(
         Optional[str],
         Field(description="Memory subdirectory to search (default: 'default')"),
     ] = None,
+    preset: Annotated[
+        Literal["fast", "balanced", "accurate"],
+        Field(description="Speed/recall trade-off of the approximate search"),
+    ] = "balanced",
 ) -> MemoryResponse | MemoryError:
     """Search for memories using semantic similarity"""
     try:
         _PRINTER.print(f"Searching memories: {query}")
         
         mem_subdir = memory_subdir or "default"
-        memory = await Memory.get_by_subdir(mem_subdir)
-        
-        docs = await memory.search_similarity_threshold(
-            query=query,
-            limit=limit,
-            threshold=threshold,
-            filter=filter or ""
-        )
+        memory = await _get_memory(mem_subdir)
+        
+        # near-duplicate queries against an unchanged db reuse earlier results
+        query_vector = await memory.db.embeddings.aembed_query(query)
+        cache_key = (memory.db.generation, memory.db.version, filter or "", threshold, preset)
+        cached = _SEARCH_CACHE.get(query_vector, cache_key)
+        if cached is not None and cached[0] >= limit:
+            docs = cached[1][:limit]
+        else:
+            fetch_limit = max(limit, SEARCH_CACHE_MIN_LIMIT)
+            docs = await memory.search_similarity_threshold(
+                query=query,
+                limit=fetch_limit,
+                threshold=threshold,
+                filter=filter or "",
+                preset=preset,
+            )
+            _SEARCH_CACHE.put(query_vector, cache_key, (fetch_limit, docs))
+            docs = docs[:limit]
         
         results = [
             {
@@ -150,7 +363,7 @@ async def delete_memories(
     """Delete memories by query or specific IDs"""
     try:
         mem_subdir = memory_subdir or "default"
-        memory = await Memory.get_by_subdir(mem_subdir)
+        memory = await _get_memory(mem_subdir)
         
         if ids:
             _PRINTER.print(f"Deleting {len(ids)} memories by ID")
@@ -174,6 +387,30 @@ async def delete_memories(
         return MemoryError(error=str(e))
 
 
+@memory_mcp.tool(
+    name="reset_memory",
+    description="Drop the cached memory database so the next call reloads it from disk",
+)
+async def reset_memory(
+    memory_subdir: Annotated[
+        Optional[str],
+        Field(description="Memory subdirectory to reset (default: 'default')"),
+    ] = None,
+) -> MemoryResponse | MemoryError:
+    """Invalidate the cached memory handle for a subdirectory"""
+    try:
+        mem_subdir = memory_subdir or "default"
+        async with _SUBDIR_LOCK:
+            _SUBDIR_CACHE.pop(mem_subdir, None)
+            Memory.index.pop(mem_subdir, None)
+        _SEARCH_CACHE.clear()
+        _PRINTER.print(f"Memory cache reset for subdir: {mem_subdir}")
+        return MemoryResponse(message=f"Memory cache reset for '{mem_subdir}'")
+    except Exception as e:
+        _PRINTER.print(f"Error resetting memory: {e}")
+        return MemoryError(error=str(e))
+
+
 @memory_mcp.tool(
     name="save_knowledge",
     description="Save knowledge base entry to a specific area (main, fragments, solutions, instruments)",
@@ -200,12 +437,13 @@ async def save_knowledge(
             return MemoryError(error=f"Invalid area. Must be one of: {valid_areas}")
         
         # Create knowledge directory path
-        kn_path = files.get_abs_path("knowledge", kn_subdir, area)
-        os.makedirs(kn_path, exist_ok=True)
+        kn_path = _kn_path(kn_subdir, area)
+        _ensure_dir(kn_path)
         
         # Save the file
         file_path = os.path.join(kn_path, filename)
-        files.write_file(file_path, content)
+        _ensure_dir(os.path.dirname(file_path))
+        _write_text_atomic(file_path, sanitize_string(content))
         
         _PRINTER.print(f"Saved knowledge to: {file_path}")
         
@@ -236,7 +474,7 @@ async def get_knowledge(
     """Retrieve a knowledge entry"""
     try:
         kn_subdir = knowledge_subdir or "default"
-        file_path = files.get_abs_path("knowledge", kn_subdir, area, filename)
+        file_path = os.path.join(_kn_path(kn_subdir, area), filename)
         
         if not os.path.exists(file_path):
             return MemoryError(error=f"Knowledge file not found: {filename}")
@@ -268,27 +506,16 @@ async def save_agent_rule(
     try:
         profile_name = profile or "default"
         
-        # Create rules directory if it doesn't exist
-        rules_path = files.get_abs_path("agents", profile_name)
-        os.makedirs(rules_path, exist_ok=True)
+        # Rules file for the profile, create its directory if it doesn't exist
+        rules_file = _rules_path(profile_name)
+        _ensure_dir(os.path.dirname(rules_file))
         
-        # Load existing rules file or create new one
-        rules_file = os.path.join(rules_path, "rules.json")
-        
-        rules = {}
-        if os.path.exists(rules_file):
-            with open(rules_file, "r") as f:
-                rules = json.load(f)
-        
-        # Add or update rule
-        rules[rule_name] = {
-            "content": rule_content,
-            "updated_at": Memory.get_timestamp()
-        }
-        
-        # Save rules file
-        with open(rules_file, "w") as f:
-            json.dump(rules, f, indent=2)
+        # Add or update rule, written with any other saves in the same window
+        _queue_rule(
+            rules_file,
+            rule_name,
+            {"content": rule_content, "updated_at": Memory.get_timestamp()},
+        )
         
         _PRINTER.print(f"Saved rule '{rule_name}' to profile '{profile_name}'")
         
@@ -301,6 +528,72 @@ async def save_agent_rule(
         return MemoryError(error=str(e))
 
 
+@memory_mcp.tool(
+    name="save_agent_rules_batch",
+    description="Save or update several agent behavioral rules with a single write",
+)
+async def save_agent_rules_batch(
+    rules: Annotated[
+        Dict[str, str],
+        Field(description="Mapping of rule name to rule content"),
+    ],
+    profile: Annotated[
+        Optional[str],
+        Field(description="Agent profile to apply rules to (default: 'default')"),
+    ] = None,
+) -> MemoryResponse | MemoryError:
+    """Save several agent behavioral rules at once"""
+    try:
+        profile_name = profile or "default"
+        
+        rules_file = _rules_path(profile_name)
+        _ensure_dir(os.path.dirname(rules_file))
+        
+        timestamp = Memory.get_timestamp()
+        with _rules_lock(rules_file):
+            # include buffered single saves so they are not overwritten
+            existing = dict(_load_rules(rules_file))
+            existing.update(_RULES_PENDING.pop(rules_file, {}))
+            for rule_name, rule_content in rules.items():
+                existing[rule_name] = {"content": rule_content, "updated_at": timestamp}
+            _save_rules(rules_file, existing)
+        
+        _PRINTER.print(f"Saved {len(rules)} rules to profile '{profile_name}'")
+        
+        return MemoryResponse(
+            message=f"Saved {len(rules)} rules",
+            data={"rule_names": list(rules), "profile": profile_name}
+        )
+    except Exception as e:
+        _PRINTER.print(f"Error saving rules: {e}")
+        return MemoryError(error=str(e))
+
+
+@memory_mcp.tool(
+    name="flush_rules",
+    description="Write any buffered rule saves to disk now",
+)
+async def flush_rules(
+    profile: Annotated[
+        Optional[str],
+        Field(description="Agent profile to flush (default: all profiles)"),
+    ] = None,
+) -> MemoryResponse | MemoryError:
+    """Flush buffered rule saves"""
+    try:
+        if profile:
+            written = _flush_rules_file(_rules_path(profile))
+        else:
+            written = _flush_all_rules()
+        return MemoryResponse(
+            message=f"Flushed {written} rules",
+            data={"flushed": written}
+        )
+    except Exception as e:
+        _PRINTER.print(f"Error flushing rules: {e}")
+        return MemoryError(error=str(e))
+
+
 @memory_mcp.tool(
     name="get_agent_rules",
     description="Get all behavioral rules for an agent profile",
@@ -314,7 +607,8 @@ async def get_agent_rules(
     """Get all rules for an agent profile"""
     try:
         profile_name = profile or "default"
-        rules_file = files.get_abs_path("agents", profile_name, "rules.json")
+        rules_file = _rules_path(profile_name)
+        _flush_rules_file(rules_file)
         
         if not os.path.exists(rules_file):
             return MemoryResponse(
@@ -322,8 +616,7 @@ async def get_agent_rules(
                 data={"rules": {}, "profile": profile_name}
             )
         
-        with open(rules_file, "r") as f:
-            rules = json.load(f)
+        rules = dict(_load_rules(rules_file))
         
         return MemoryResponse(
             message=f"Retrieved {len(rules)} rules",
@@ -360,7 +653,7 @@ async def compress_memories(
         _PRINTER.print(f"Compressing memories in: {mem_subdir}")
         
         # Get memory instance
-        memory = await Memory.get_by_subdir(mem_subdir)
+        memory = await _get_memory(mem_subdir)
         
         # Get all documents
         all_docs = memory.db.get_all_docs()
@@ -6,7 +6,7 @@ This module implements a background memory monitoring agent that:
 - Automatically determines when to save memories
 - Decides how to organize memories (hierarchical, linear, parallel)
 - Implements short-term and long-term memory separation
-- Runs on a separate thread using Ollama for efficiency
+- Runs on a background event loop using Ollama for efficiency
 
 The memory agent watches for:
 - Important facts, preferences, and context
@@ -17,18 +17,38 @@ The memory agent watches for:
 """
 
 import asyncio
+import bisect
+import heapq
+import itertools
 import threading
-import queue
+import time
+from collections import deque
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, field
+from functools import lru_cache
 from enum import Enum
 import json
+import logging
+import re
+
+import httpx
 
 from python.helpers.print_style import PrintStyle
-from python.helpers import files
+from python.helpers import dotenv, files
+from python.helpers.defer import EventLoopThread
 import models
 
+# Routine loop messages are debug logs, lifecycle changes and errors still print
+logger = logging.getLogger("agent_zero.memory_monitor")
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 
 class MemoryType(Enum):
     """Types of memories to store"""
@@ -47,7 +67,7 @@ class MemoryOrganization(Enum):
     GRAPH = "graph"           # Network of related memories
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConversationEvent:
     """Represents a conversation event to be processed"""
     timestamp: datetime
@@ -58,7 +78,7 @@ class ConversationEvent:
     context_id: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryCandidate:
     """A potential memory to be saved"""
     content: str
@@ -71,11 +91,137 @@ class MemoryCandidate:
     related_memories: List[str] = field(default_factory=list)
 
 
+# Heuristic keyword rules, applied in order:
+# (category, importance, memory type or None, required speaker or None, keywords)
+_HEURISTIC_RULES = [
+    ("user_preference", 0.3, MemoryType.LONG_TERM, "user",
+     ["remember", "note that", "important", "don't forget", "keep in mind"]),
+    ("preference", 0.2, MemoryType.SEMANTIC, "user",
+     ["always", "never", "prefer", "like", "dislike"]),
+    ("solution", 0.3, MemoryType.PROCEDURAL, None,
+     ["solution", "fixed", "solved", "here's how", "steps to", "workaround"]),
+    ("knowledge", 0.2, MemoryType.SEMANTIC, "agent",
+     ["is defined as", "means", "refers to", "the formula"]),
+    ("code", 0.2, MemoryType.PROCEDURAL, None,
+     ["```", "def ", "class ", "function", "import "]),
+    ("configuration", 0.15, None, None,
+     ["config", "setting", "configure", "setup", "install"]),
+    ("error", 0.1, None, None,
+     ["error", "exception", "failed", "traceback"]),
+]
+
+
+class _KeywordMatcher:
+    """Finds which heuristic rules match a message in a single pass."""
+
+    def __init__(self, rules):
+        self.rule_ids: Dict[str, List[int]] = {}
+        for index, rule in enumerate(rules):
+            for keyword in rule[4]:
+                self.rule_ids.setdefault(keyword, []).append(index)
+
+        if AHOCORASICK_AVAILABLE:
+            self.automaton = ahocorasick.Automaton()
+            for keyword, ids in self.rule_ids.items():
+                self.automaton.add_word(keyword, ids)
+            self.automaton.make_automaton()
+        else:
+            # lookahead reports overlapping matches, like the automaton does
+            alternation = "|".join(
+                re.escape(kw) for kw in sorted(self.rule_ids, key=len, reverse=True)
+            )
+            self.pattern = re.compile(f"(?=({alternation}))")
+
+    def match(self, text: str) -> set:
+        return self.match_many([text])[0]
+
+    def match_many(self, texts: List[str]) -> List[set]:
+        # one scan over all texts joined by a separator no keyword contains,
+        # hit offsets are mapped back to the text they fall in
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        joined = "\0".join(texts)
+        matched: List[set] = [set() for _ in texts]
+
+        if AHOCORASICK_AVAILABLE:
+            for end, ids in self.automaton.iter(joined):
+                matched[bisect.bisect_right(starts, end) - 1].update(ids)
+        else:
+            for found in self.pattern.finditer(joined):
+                index = bisect.bisect_right(starts, found.start()) - 1
+                matched[index].update(self.rule_ids[found.group(1)])
+        return matched
+
+
+_heuristic_matcher = _KeywordMatcher(_HEURISTIC_RULES)
+
+# messages with fewer non-blank characters than this are ignored
+MIN_MESSAGE_LENGTH = 10
+
+
+def _is_too_short(message: str) -> bool:
+    """Same as len(message.strip()) < MIN_MESSAGE_LENGTH, stripping only when needed"""
+    if len(message) < MIN_MESSAGE_LENGTH:
+        return True
+    if not message[0].isspace() and not message[-1].isspace():
+        return False
+    return len(message.strip()) < MIN_MESSAGE_LENGTH
+
+
+# whitespace separated words, same split as str.split()
+_WORD_PATTERN = re.compile(r"\S+")
+
+# Prompt for batched model analysis, one JSON object per numbered message
+_ANALYSIS_PROMPT = """You decide which conversation messages an AI agent should remember.
+For each numbered message return an object with:
+- "index": the message number
+- "importance": 0.0 to 1.0
+- "type": one of "short_term", "long_term", "episodic", "semantic", "procedural"
+- "categories": short category names
+- "keywords": up to 5 keywords
+Respond with JSON only: {{"memories": [...]}}
+
+Messages:
+{messages}"""
+
+# seconds to wait before retrying the model after a failed call
+MODEL_RETRY_DELAY = 60.0
+
+# Long-term candidates kept while auto-save is off, oldest are dropped first
+PENDING_LONG_TERM_LIMIT = 500
+
+
+@lru_cache(maxsize=1024)
+def _score_rules(matched: frozenset, speaker: str) -> tuple:
+    """
+    Score a set of matched heuristic rules for a speaker.
+    
+    There are only a few hundred distinct outcomes, so results are cached.
+    
+    Returns:
+        (importance, categories, memory type)
+    """
+    importance = 0.0
+    categories = []
+    memory_type = MemoryType.SHORT_TERM
+    for index, (category, weight, rule_type, rule_speaker, _) in enumerate(_HEURISTIC_RULES):
+        if index not in matched or (rule_speaker and speaker != rule_speaker):
+            continue
+        importance += weight
+        categories.append(category)
+        if rule_type is not None:
+            memory_type = rule_type
+    return importance, tuple(categories), memory_type
+
+
 class MemoryMonitor:
     """
     Background agent that monitors conversations and manages memories.
     
-    Runs on a separate thread and uses a lightweight Ollama model
+    Runs on a background event loop and uses a lightweight Ollama model
     to analyze conversations and decide what to remember.
     """
     
@@ -85,6 +231,7 @@ class MemoryMonitor:
         importance_threshold: float = 0.5,
         short_term_ttl: int = 3600,  # 1 hour in seconds
         enable_auto_save: bool = True,
+        enable_model_analysis: Optional[bool] = None,
     ):
         """
         Initialize the memory monitor.
@@ -94,22 +241,31 @@ class MemoryMonitor:
             importance_threshold: Minimum importance score to save a memory
             short_term_ttl: Time-to-live for short-term memories in seconds
             enable_auto_save: Whether to automatically save memories
+            enable_model_analysis: Whether to ask the Ollama model about events,
+                defaults to the MEMORY_MONITOR_MODEL_ANALYSIS env setting
         """
         self.model_name = model_name
         self.importance_threshold = importance_threshold
         self.short_term_ttl = short_term_ttl
         self.enable_auto_save = enable_auto_save
         
-        # Event queue for conversation events
-        self.event_queue: queue.Queue = queue.Queue()
+        # Event queue for conversation events, consumed on the monitor's event loop
+        self.event_queue: asyncio.Queue = asyncio.Queue()
         
-        # Thread management
-        self.monitor_thread: Optional[threading.Thread] = None
+        # Event loop management
+        self._loop_thread: Optional[EventLoopThread] = None
+        self._monitor_future: Optional[Future] = None
+        self._cleanup_handle: Optional[asyncio.TimerHandle] = None
+        self._state_lock = threading.Lock()
         self.running = False
         
         # Memory storage
-        self.short_term_memories: List[MemoryCandidate] = []
-        self.pending_long_term: List[MemoryCandidate] = []
+        self.short_term_memories: deque[MemoryCandidate] = deque()
+        # min-heap of (expiry epoch, insertion seq, candidate) for TTL eviction
+        self._short_term_expiry: List[tuple] = []
+        self._short_term_seq = itertools.count()
+        # Long-term candidates not yet written, drained by the batched flush
+        self.pending_long_term: deque[MemoryCandidate] = deque(maxlen=PENDING_LONG_TERM_LIMIT)
         
         # Statistics
         self.stats = {
@@ -122,9 +278,23 @@ class MemoryMonitor:
         # Callback for when memories are saved
         self.on_memory_saved: Optional[Callable[[MemoryCandidate], None]] = None
         
+        # Seconds between batched writes of pending long-term memories
+        self._flush_interval = 2.0
+        
         # Model configuration
+        if enable_model_analysis is None:
+            enable_model_analysis = str(
+                dotenv.get_dotenv_value("MEMORY_MONITOR_MODEL_ANALYSIS", "true")
+            ).lower() in ("1", "true", "yes")
+        self.enable_model_analysis = enable_model_analysis
         self.model_config = None
-        self._init_model()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._model_retry_at = 0.0
+        # None until the one-time probe has checked Ollama serves the model
+        self._model_available: Optional[bool] = None
+        self._model_failing = False
+        if self.enable_model_analysis:
+            self._init_model()
     
     def _init_model(self):
         """Initialize the Ollama model configuration"""
@@ -150,35 +320,46 @@ class MemoryMonitor:
             )
     
     def start(self):
-        """Start the memory monitoring thread"""
-        if self.running:
-            PrintStyle(font_color="yellow", padding=True).print(
-                "Memory monitor is already running"
-            )
-            return
-        
-        self.running = True
-        self.monitor_thread = threading.Thread(
-            target=self._monitor_loop,
-            name="MemoryMonitor",
-            daemon=True
-        )
-        self.monitor_thread.start()
+        """Start the memory monitoring loop"""
+        with self._state_lock:
+            if self.running:
+                PrintStyle(font_color="yellow", padding=True).print(
+                    "Memory monitor is already running"
+                )
+                return
+            
+            self.event_queue = asyncio.Queue()
+            self._loop_thread = EventLoopThread("MemoryMonitor")
+            self.running = True
+            self._monitor_future = self._loop_thread.run_coroutine(self._monitor_loop())
         
         PrintStyle(font_color="green", padding=True).print(
             "Memory monitor started"
         )
     
     def stop(self):
-        """Stop the memory monitoring thread"""
-        if not self.running:
-            return
-        
-        self.running = False
-        
-        # Wait for thread to finish
-        if self.monitor_thread and self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=5)
+        """Stop the memory monitoring loop"""
+        with self._state_lock:
+            if not self.running:
+                return
+            
+            self.running = False
+            
+            # Write out buffered memories before the loop goes away
+            loop = self._loop_thread.loop if self._loop_thread else None
+            if self.enable_auto_save and self.pending_long_term and loop and loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(self._flush_saves(), loop).result(timeout=5)
+                except Exception as e:
+                    PrintStyle(font_color="red", padding=True).print(
+                        f"Failed to flush memories on stop: {e}"
+                    )
+            
+            # Cancel the monitor task, its loop thread is shared and stays up idle
+            if self._monitor_future:
+                self._monitor_future.cancel()
+            if self._cleanup_handle and self._loop_thread and self._loop_thread.loop:
+                self._loop_thread.loop.call_soon_threadsafe(self._cleanup_handle.cancel)
         
         PrintStyle(font_color="yellow", padding=True).print(
             "Memory monitor stopped"
@@ -188,168 +369,306 @@ class MemoryMonitor:
         """
         Broadcast a conversation event to the monitor.
         
+        Safe to call from any thread or event loop.
+        
         Args:
             event: The conversation event to process
         """
         if not self.running:
             self.start()
         
-        self.event_queue.put(event)
+        with self._state_lock:
+            if self._loop_thread and self._loop_thread.loop:
+                self._loop_thread.loop.call_soon_threadsafe(self.event_queue.put_nowait, event)
     
-    def _monitor_loop(self):
-        """Main monitoring loop running in background thread"""
-        PrintStyle(font_color="cyan", padding=True).print(
-            "Memory monitor thread started"
-        )
+    async def _monitor_loop(self):
+        """Main monitoring loop running on the monitor's event loop"""
+        logger.debug("Memory monitor loop started")
         
-        while self.running:
-            try:
-                # Get event from queue with timeout
+        # Clean up old short-term memories once a second
+        self._schedule_cleanup()
+        
+        # Persist auto-saved memories in batches
+        flush_task = asyncio.create_task(self._flush_loop())
+        
+        try:
+            while self.running:
                 try:
-                    event = self.event_queue.get(timeout=1)
-                except queue.Empty:
-                    # No events, clean up old short-term memories
-                    self._cleanup_short_term()
-                    continue
-                
-                # Process the event
-                self._process_event(event)
-                self.stats["events_processed"] += 1
-                
-                # Mark task as done
-                self.event_queue.task_done()
-                
+                    # Wait for a batch of events
+                    batch = await self._drain()
+                    
+                    # Process the events
+                    await self._process_events(batch)
+                    
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    PrintStyle(font_color="red", padding=True).print(
+                        f"Error in memory monitor loop: {e}"
+                    )
+        finally:
+            flush_task.cancel()
+            if self._http:
+                await self._http.aclose()
+                self._http = None
+            logger.debug("Memory monitor loop stopped")
+    
+    def _schedule_cleanup(self):
+        """Run short-term cleanup and schedule the next one"""
+        self._cleanup_short_term()
+        if self.running:
+            self._cleanup_handle = asyncio.get_running_loop().call_later(
+                1.0, self._schedule_cleanup
+            )
+    
+    async def _drain(self, max_batch: int = 64) -> List[ConversationEvent]:
+        """
+        Wait for the next event, then take whatever else is already queued.
+        
+        Args:
+            max_batch: Maximum number of events to take at once
+            
+        Returns:
+            The events taken
+        """
+        batch = [await self.event_queue.get()]
+        
+        while len(batch) < max_batch:
+            try:
+                batch.append(self.event_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+    
+    async def _process_events(self, events: List[ConversationEvent]):
+        """
+        Process a batch of conversation events.
+        
+        Keyword matching runs once over the whole batch, and the model (when
+        available) is asked about all messages worth analyzing in one call.
+        
+        Args:
+            events: The conversation events to process
+        """
+        matches = _heuristic_matcher.match_many([e.message.lower() for e in events])
+        
+        analyses: Dict[int, Dict[str, Any]] = {}
+        candidates = [i for i, e in enumerate(events) if not _is_too_short(e.message)]
+        if candidates and self._model_ready() and await self._probe_model():
+            analyses = await self._model_analysis([events[i] for i in candidates])
+            analyses = {candidates[i]: a for i, a in analyses.items() if i < len(candidates)}
+        
+        for index, (event, matched) in enumerate(zip(events, matches)):
+            try:
+                self._process_event(event, matched, analyses.get(index))
             except Exception as e:
                 PrintStyle(font_color="red", padding=True).print(
-                    f"Error in memory monitor loop: {e}"
+                    f"Error processing memory event: {e}"
                 )
         
-        PrintStyle(font_color="cyan", padding=True).print(
-            "Memory monitor thread stopped"
-        )
+        self.stats["events_processed"] += len(events)
+        for _ in events:
+            self.event_queue.task_done()
     
-    def _process_event(self, event: ConversationEvent):
+    def _process_event(
+        self,
+        event: ConversationEvent,
+        matched: Optional[set] = None,
+        analysis: Optional[Dict[str, Any]] = None,
+    ):
         """
         Process a conversation event and extract memories.
         
         Args:
             event: The conversation event to process
+            matched: Heuristic rules already matched for this event, if any
+            analysis: Model analysis of this event, if any
         """
         # Skip very short messages
-        if len(event.message.strip()) < 10:
+        if _is_too_short(event.message):
             return
         
         # Analyze the event to determine if it contains memorable information
-        memory_candidate = self._analyze_event(event)
+        memory_candidate = self._analyze_event(event, matched, analysis)
         
         if memory_candidate and memory_candidate.importance >= self.importance_threshold:
             # Add to appropriate memory store
             if memory_candidate.memory_type == MemoryType.SHORT_TERM:
-                self.short_term_memories.append(memory_candidate)
+                self._add_short_term(memory_candidate)
                 self.stats["short_term_count"] += 1
             elif memory_candidate.memory_type in [MemoryType.LONG_TERM, MemoryType.SEMANTIC, MemoryType.PROCEDURAL]:
+                # Written by the next flush when auto-save is enabled
                 self.pending_long_term.append(memory_candidate)
-                
-                # Auto-save if enabled
-                if self.enable_auto_save:
-                    self._save_memory(memory_candidate)
     
-    def _analyze_event(self, event: ConversationEvent) -> Optional[MemoryCandidate]:
+    def _model_ready(self) -> bool:
+        """Whether model analysis should be attempted now"""
+        return (
+            bool(self.model_config)
+            and self._model_available is not False
+            and time.monotonic() >= self._model_retry_at
+        )
+    
+    def _get_http(self) -> httpx.AsyncClient:
+        """One keep-alive client for the lifetime of the monitor loop"""
+        assert self.model_config
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.model_config.api_base,
+                limits=httpx.Limits(max_keepalive_connections=4),
+                timeout=30,
+            )
+        return self._http
+    
+    async def _probe_model(self) -> bool:
+        """
+        Check once whether Ollama is reachable and has the model, so installs
+        without Ollama never send analysis requests.
+        
+        Returns:
+            Whether model analysis is available
+        """
+        if self._model_available is None:
+            assert self.model_config
+            try:
+                response = await self._get_http().get("/api/tags", timeout=5)
+                response.raise_for_status()
+                names = {model.get("name") for model in response.json().get("models", [])}
+                name = self.model_config.name
+                self._model_available = name in names or f"{name}:latest" in names
+                reason = f"model {name} is not pulled"
+            except Exception as e:
+                self._model_available = False
+                reason = f"Ollama is not reachable ({e})"
+            if not self._model_available:
+                PrintStyle(font_color="yellow", padding=True).print(
+                    f"Memory monitor model analysis disabled, {reason}; using keyword heuristics"
+                )
+        return self._model_available
+    
+    async def _model_analysis(
+        self, events: List[ConversationEvent]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Analyze a batch of events with a single Ollama generation call.
+        
+        Args:
+            events: The events to analyze
+            
+        Returns:
+            Model analysis per position in events, empty if the call failed
+        """
+        assert self.model_config
+        messages = "\n".join(
+            f"{i}. [{event.speaker}] {json.dumps(event.message)}"
+            for i, event in enumerate(events)
+        )
+        try:
+            response = await self._get_http().post(
+                "/api/generate",
+                json={
+                    "model": self.model_config.name,
+                    "prompt": _ANALYSIS_PROMPT.format(messages=messages),
+                    "format": "json",
+                    "stream": False,
+                },
+            )
+            response.raise_for_status()
+            memories = json.loads(response.json()["response"])["memories"]
+            self._model_failing = False
+            return {
+                int(item["index"]): item
+                for item in memories
+                if isinstance(item, dict) and "index" in item
+            }
+        except Exception as e:
+            self._model_retry_at = time.monotonic() + MODEL_RETRY_DELAY
+            # warn when the model starts failing, not on every retry
+            if self._model_failing:
+                logger.debug("Memory analysis failed again, using fallback: %s", e)
+            else:
+                self._model_failing = True
+                PrintStyle(font_color="yellow", padding=True).print(
+                    f"Memory analysis failed, using fallback: {e}"
+                )
+            return {}
+    
+    def _analyze_event(
+        self,
+        event: ConversationEvent,
+        matched: Optional[set] = None,
+        analysis: Optional[Dict[str, Any]] = None,
+    ) -> Optional[MemoryCandidate]:
         """
         Analyze an event to determine if it should be remembered.
         
-        Uses the Ollama model to assess importance and extract key information.
+        Uses the Ollama model's assessment when one is available for the event.
         
         Args:
             event: The event to analyze
+            matched: Heuristic rules already matched for this event, if any
+            analysis: Model analysis of this event, if any
             
         Returns:
             MemoryCandidate if the event is worth remembering, None otherwise
         """
         # Fallback heuristic-based analysis if model is not available
-        if not self.model_config:
-            return self._heuristic_analysis(event)
+        if not analysis:
+            return self._heuristic_analysis(event, matched)
         
         try:
-            # Use the model to analyze the conversation
-            # This would be an async call in practice, but we're in a thread
-            # so we'll use a simplified synchronous approach
-            
-            # For now, use heuristic analysis
-            # TODO: Implement async model call from thread
-            return self._heuristic_analysis(event)
+            categories = [str(c) for c in analysis.get("categories") or []]
+            keywords = [str(k) for k in analysis.get("keywords") or []][:5]
+            return MemoryCandidate(
+                content=event.message,
+                memory_type=MemoryType(analysis.get("type", MemoryType.SHORT_TERM.value)),
+                importance=min(max(float(analysis.get("importance", 0.0)), 0.0), 1.0),
+                categories=categories or ["general"],
+                timestamp=event.timestamp,
+                source_event=event,
+                keywords=keywords,
+                related_memories=[]
+            )
             
         except Exception as e:
-            PrintStyle(font_color="yellow", padding=True).print(
-                f"Memory analysis failed, using fallback: {e}"
-            )
-            return self._heuristic_analysis(event)
+            logger.debug("Unusable model analysis, using fallback: %s", e)
+            return self._heuristic_analysis(event, matched)
     
-    def _heuristic_analysis(self, event: ConversationEvent) -> Optional[MemoryCandidate]:
+    def _heuristic_analysis(
+        self, event: ConversationEvent, matched: Optional[set] = None
+    ) -> Optional[MemoryCandidate]:
         """
         Heuristic-based analysis when model is not available.
         
         Args:
             event: The event to analyze
+            matched: Heuristic rules already matched for this event, if any
             
         Returns:
             MemoryCandidate if the event meets heuristic criteria
         """
-        message = event.message.lower()
-        importance = 0.0
-        categories = []
-        keywords = []
-        memory_type = MemoryType.SHORT_TERM
-        
-        # Check for important keywords and patterns
-        
-        # User preferences and instructions
-        if event.speaker == "user":
-            if any(kw in message for kw in ["remember", "note that", "important", "don't forget", "keep in mind"]):
-                importance += 0.3
-                categories.append("user_preference")
-                memory_type = MemoryType.LONG_TERM
-            
-            if any(kw in message for kw in ["always", "never", "prefer", "like", "dislike"]):
-                importance += 0.2
-                categories.append("preference")
-                memory_type = MemoryType.SEMANTIC
-        
-        # Solutions and procedures
-        if any(kw in message for kw in ["solution", "fixed", "solved", "here's how", "steps to", "workaround"]):
-            importance += 0.3
-            categories.append("solution")
-            memory_type = MemoryType.PROCEDURAL
-        
-        # Facts and knowledge
-        if event.speaker == "agent" and any(kw in message for kw in ["is defined as", "means", "refers to", "the formula"]):
-            importance += 0.2
-            categories.append("knowledge")
-            memory_type = MemoryType.SEMANTIC
-        
-        # Code snippets
-        if "```" in event.message or any(kw in message for kw in ["def ", "class ", "function", "import "]):
-            importance += 0.2
-            categories.append("code")
-            memory_type = MemoryType.PROCEDURAL
-        
-        # Configuration and settings
-        if any(kw in message for kw in ["config", "setting", "configure", "setup", "install"]):
-            importance += 0.15
-            categories.append("configuration")
-        
-        # Error messages (lower importance but useful)
-        if any(kw in message for kw in ["error", "exception", "failed", "traceback"]):
-            importance += 0.1
-            categories.append("error")
+        raw_message = event.message
+        message = raw_message.lower()
+        
+        # Check for important keywords and patterns, one scan over the message
+        if matched is None:
+            matched = _heuristic_matcher.match(message)
+        importance, matched_categories, memory_type = _score_rules(
+            frozenset(matched), event.speaker
+        )
+        categories = list(matched_categories)
         
         # Extract potential keywords (simple approach)
-        words = message.split()
-        # Get words longer than 4 characters as potential keywords
-        keywords = [w.strip(".,!?;:") for w in words if len(w) > 4][:5]
+        # Get the first 5 words longer than 4 characters, scanning only as far as needed
+        keywords = []
+        for found in _WORD_PATTERN.finditer(message):
+            word = found.group()
+            if len(word) > 4:
+                keywords.append(word.strip(".,!?;:"))
+                if len(keywords) == 5:
+                    break
         
         # Adjust importance based on message length and structure
-        if len(event.message) > 100:
+        if len(raw_message) > 100:
             importance += 0.1  # Longer messages might be more detailed
         
         if not categories:
@@ -374,45 +693,89 @@ class MemoryMonitor:
             related_memories=[]
         )
     
+    def _add_short_term(self, memory: MemoryCandidate):
+        """Store a short-term memory and schedule its expiry"""
+        expiry = memory.timestamp.timestamp() + self.short_term_ttl
+        self.short_term_memories.append(memory)
+        heapq.heappush(
+            self._short_term_expiry, (expiry, next(self._short_term_seq), memory)
+        )
+    
     def _cleanup_short_term(self):
         """Remove expired short-term memories"""
-        current_time = datetime.now(timezone.utc)
-        
-        # Filter out expired memories
-        self.short_term_memories = [
-            mem for mem in self.short_term_memories
-            if (current_time - mem.timestamp).total_seconds() < self.short_term_ttl
-        ]
+        now = time.time()
+        
+        # Only expired entries are touched, they are usually the oldest ones
+        while self._short_term_expiry and self._short_term_expiry[0][0] <= now:
+            _, _, memory = heapq.heappop(self._short_term_expiry)
+            if self.short_term_memories and self.short_term_memories[0] is memory:
+                self.short_term_memories.popleft()
+            else:
+                self.short_term_memories.remove(memory)
     
-    def _save_memory(self, memory: MemoryCandidate):
-        """
-        Save a memory using the agent's memory system.
+    async def _flush_loop(self):
+        """Periodically write pending long-term memories"""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self._flush_saves()
+    
+    async def _flush_saves(self):
+        """Drain pending long-term memories, one vector DB insert per memory subdir"""
+        if not self.enable_auto_save or not self.pending_long_term:
+            return
+        batch = list(self.pending_long_term)
+        self.pending_long_term.clear()
         
-        Args:
-            memory: The memory to save
-        """
-        try:
-            # Here we would integrate with the existing memory system
-            # For now, we'll just log it
-            
-            PrintStyle(font_color="green", padding=True).print(
-                f"Memory saved: {memory.memory_type.value} - {memory.categories} - "
-                f"Importance: {memory.importance:.2f}"
-            )
-            
-            self.stats["memories_saved"] += 1
-            
-            if memory.memory_type != MemoryType.SHORT_TERM:
-                self.stats["long_term_count"] += 1
+        # imported here, memory imports agent which imports this module
+        from python.helpers.memory import Memory
+        
+        groups: Dict[str, List[MemoryCandidate]] = {}
+        for memory in batch:
+            subdir = memory.source_event.context.get("memory_subdir") or "default"
+            groups.setdefault(subdir, []).append(memory)
+        
+        for subdir, memories in groups.items():
+            try:
+                db = await Memory.get_by_subdir(subdir)
+                await db.insert_texts(
+                    [memory.content for memory in memories],
+                    [self._memory_metadata(memory) for memory in memories],
+                )
+            except Exception as e:
+                PrintStyle(font_color="red", padding=True).print(
+                    f"Failed to save {len(memories)} memories: {e}"
+                )
+                continue
             
-            # Call callback if set
-            if self.on_memory_saved:
-                self.on_memory_saved(memory)
+            logger.debug("Saved %d memories to '%s'", len(memories), subdir)
+            for memory in memories:
+                logger.debug(
+                    "Memory saved: %s - %s - Importance: %.2f",
+                    memory.memory_type.value, memory.categories, memory.importance,
+                )
+                self.stats["memories_saved"] += 1
                 
-        except Exception as e:
-            PrintStyle(font_color="red", padding=True).print(
-                f"Failed to save memory: {e}"
-            )
+                if memory.memory_type != MemoryType.SHORT_TERM:
+                    self.stats["long_term_count"] += 1
+                
+                # Call callback if set
+                if self.on_memory_saved:
+                    self.on_memory_saved(memory)
+    
+    @staticmethod
+    def _memory_metadata(memory: MemoryCandidate) -> Dict[str, Any]:
+        """Vector DB metadata for a memory candidate"""
+        area = "solutions" if memory.memory_type == MemoryType.PROCEDURAL else "main"
+        return {
+            "area": area,
+            "source": "memory_monitor",
+            "memory_type": memory.memory_type.value,
+            "importance": memory.importance,
+            "categories": memory.categories,
+            "keywords": memory.keywords,
+            "agent_name": memory.source_event.agent_name,
+            "context_id": memory.source_event.context_id,
+        }
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get memory monitor statistics"""
@@ -427,11 +790,11 @@ class MemoryMonitor:
     def get_short_term_memories(self) -> List[MemoryCandidate]:
         """Get current short-term memories"""
         self._cleanup_short_term()
-        return self.short_term_memories.copy()
+        return list(self.short_term_memories)
     
     def get_pending_long_term(self) -> List[MemoryCandidate]:
         """Get pending long-term memories"""
-        return self.pending_long_term.copy()
+        return list(self.pending_long_term.copy())
 
 
 # Global memory monitor instance
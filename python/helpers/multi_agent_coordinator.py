@@ -4,15 +4,74 @@ Manages multiple specialized agents working together on complex tasks
 """
 
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from collections import OrderedDict, deque
+from functools import lru_cache
 from enum import Enum
 import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
 
 from agent import Agent, AgentContext, UserMessage, AgentConfig
 from initialize import initialize_agent
+from python.helpers import history
 from python.helpers.print_style import PrintStyle
 
 _PRINTER = PrintStyle(italic=True, font_color="magenta", padding=False)
+# per-agent progress is routine, batch-level messages stay on the console
+logger = logging.getLogger("agent_zero.multi_agent_coordinator")
+
+# idle agent pool limits
+POOL_MAX_IDLE = 4  # idle agents kept per context and config key
+POOL_IDLE_TTL = 600.0  # seconds an idle agent may wait before it is dropped
+POOL_PRUNE_INTERVAL = 60.0
+
+# finished results of opt-in cached tasks, reused only within the same context
+RESULT_CACHE_MAXSIZE = 512
+RESULT_CACHE_TTL = 900.0
+
+
+@lru_cache(maxsize=1)
+def _get_base_config() -> AgentConfig:
+    """Build the settings-derived agent config once and share it"""
+    return initialize_agent()
+
+
+@lru_cache(maxsize=None)
+def _get_profile_config(profile: str) -> tuple[AgentConfig, tuple]:
+    """Shared config and pool key for agents of one profile"""
+    config = replace(_get_base_config(), profile=profile)
+    return config, _config_key(config)
+
+
+def invalidate_config_cache():
+    """Forget the shared base config, e.g. after settings change"""
+    _get_base_config.cache_clear()
+    _get_profile_config.cache_clear()
+
+
+def _config_key(config: AgentConfig) -> tuple:
+    """Key identifying agents that can be reused for the same config"""
+    model_ids = tuple(
+        (model.provider, model.name, model.api_base)
+        for model in (
+            config.chat_model,
+            config.utility_model,
+            config.embeddings_model,
+            config.browser_model,
+        )
+    )
+    # tools and prompts are resolved from the profile
+    return (
+        config.profile,
+        model_ids,
+        config.mcp_servers,
+        config.memory_subdir,
+        tuple(config.knowledge_subdirs),
+    )
 
 
 class CoordinationStrategy(Enum):
@@ -22,61 +81,243 @@ class CoordinationStrategy(Enum):
     ADAPTIVE = "adaptive"      # Choose strategy based on task
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentTask:
     """Represents a task assigned to an agent"""
     agent_profile: str
     message: str
     priority: int = 0
-    depends_on: List[str] = None  # Task IDs this depends on
+    depends_on: tuple[str, ...] = ()  # Task IDs ("<profile>_<index>") this depends on
+    cache: bool = False  # Reuse the result of an identical earlier task in the same context
+
+
+def _dependency_waves(agent_ids: List[str], tasks: List[AgentTask]) -> List[List[int]]:
+    """
+    Group task indices into waves using Kahn's algorithm.
+    Every task runs in a later wave than all tasks it depends on.
+    
+    Raises:
+        ValueError: If a dependency is unknown or the dependencies form a cycle
+    """
+    index = {agent_id: i for i, agent_id in enumerate(agent_ids)}
+    in_degree = [0] * len(tasks)
+    dependents: List[List[int]] = [[] for _ in tasks]
+    
+    for i, task in enumerate(tasks):
+        for dep in set(task.depends_on):
+            if dep not in index:
+                raise ValueError(f"Task {agent_ids[i]} depends on unknown task {dep}")
+            dependents[index[dep]].append(i)
+            in_degree[i] += 1
     
-    def __post_init__(self):
-        if self.depends_on is None:
-            self.depends_on = []
+    waves = []
+    ready = [i for i, degree in enumerate(in_degree) if degree == 0]
+    scheduled = 0
+    while ready:
+        waves.append(ready)
+        scheduled += len(ready)
+        next_ready = []
+        for i in ready:
+            for dependent in dependents[i]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    next_ready.append(dependent)
+        ready = next_ready
+    
+    if scheduled < len(tasks):
+        cycle = [agent_ids[i] for i, degree in enumerate(in_degree) if degree > 0]
+        raise ValueError(f"Task dependencies contain a cycle: {', '.join(cycle)}")
+    
+    return waves
 
 
 class MultiAgentCoordinator:
     """Coordinates multiple specialized agents working on a problem"""
     
-    def __init__(self, context: AgentContext, max_agents: int = 5):
+    # idle agents by (context id, config key) -> (idle since, agent). Pooled
+    # agents keep their tool state (agent.data), so they never cross contexts.
+    _AGENT_POOL: Dict[tuple, deque] = {}
+    _POOL_LOCK = threading.Lock()
+    _pool_pruned_at: float = 0.0
+    
+    # results of finished tasks: (context id, config key, message digest) -> (finished at, result)
+    _RESULT_CACHE: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+    _RESULT_LOCK = threading.Lock()
+    
+    def __init__(
+        self,
+        context: AgentContext,
+        max_agents: int = 5,
+        max_idle: int = POOL_MAX_IDLE,
+        max_concurrent_llm_calls: Optional[int] = None,
+        batch_deadline_s: Optional[float] = None,
+    ):
         self.context = context
         self.max_agents = max_agents
+        self.max_idle = max_idle
+        # bounds how many agent monologues run at once
+        self.max_concurrent_llm_calls = max_concurrent_llm_calls or max_agents
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_llm_calls)
+        # seconds a parallel batch may run before it is cancelled, None for no limit
+        self.batch_deadline_s = batch_deadline_s
         self.agents: Dict[str, Agent] = {}
         self.results: Dict[str, str] = {}
+        self._agent_keys: Dict[str, tuple] = {}
         
     def create_agent(self, profile: str, agent_id: str) -> Agent:
-        """Create a specialized agent with the given profile"""
-        _PRINTER.print(f"Creating {profile} agent with ID: {agent_id}")
-        
-        # Initialize agent config with the specified profile
-        config = initialize_agent()
-        config.profile = profile
-        
-        # Create agent as a subordinate of the main agent
-        agent = Agent(len(self.agents) + 1, config, self.context)
+        """Create a specialized agent with the given profile, reusing an idle one if possible"""
+        # Shared config and pool key for the specified profile
+        config, config_key = _get_profile_config(profile)
+        key = (self.context.id, config_key)
+        
+        agent = self._take_pooled(key)
+        if agent:
+            logger.debug("Reusing pooled %s agent for ID: %s", profile, agent_id)
+            agent.config = config
+            agent.number = len(self.agents) + 1
+            agent.agent_name = f"A{agent.number}"
+        else:
+            logger.debug("Creating %s agent with ID: %s", profile, agent_id)
+            # Create agent as a subordinate of the main agent
+            agent = Agent(len(self.agents) + 1, config, self.context)
         
         # Store agent
         self.agents[agent_id] = agent
+        self._agent_keys[agent_id] = key
         
         return agent
     
+    @classmethod
+    def _take_pooled(cls, key: tuple) -> Optional[Agent]:
+        """Pop an idle agent for the given pool key, if any"""
+        with cls._POOL_LOCK:
+            cls._prune_pool()
+            idle = cls._AGENT_POOL.get(key)
+            if not idle:
+                return None
+            _, agent = idle.popleft()
+            if not idle:
+                del cls._AGENT_POOL[key]
+            return agent
+    
+    def release_agent(self, agent_id: str):
+        """Reset an agent's conversation state and return it to the idle pool"""
+        agent = self.agents.pop(agent_id, None)
+        key = self._agent_keys.pop(agent_id, None)
+        if agent is None or key is None:
+            return
+        
+        agent.history = history.History(agent)  # type: ignore[abstract]
+        agent.last_user_message = None
+        agent.intervention = None
+        agent.data.pop(Agent.DATA_NAME_SUPERIOR, None)
+        agent.data.pop(Agent.DATA_NAME_SUBORDINATE, None)
+        
+        cls = type(self)
+        with cls._POOL_LOCK:
+            idle = cls._AGENT_POOL.setdefault(key, deque())
+            idle.append((time.monotonic(), agent))
+            while len(idle) > self.max_idle:
+                idle.popleft()
+            cls._prune_pool()
+    
+    @classmethod
+    def _prune_pool(cls, force: bool = False):
+        """Drop agents idle for longer than POOL_IDLE_TTL (caller holds the lock)"""
+        now = time.monotonic()
+        if not force and now - cls._pool_pruned_at < POOL_PRUNE_INTERVAL:
+            return
+        cls._pool_pruned_at = now
+        for key in list(cls._AGENT_POOL):
+            idle = cls._AGENT_POOL[key]
+            # oldest entries sit at the left
+            while idle and now - idle[0][0] > POOL_IDLE_TTL:
+                idle.popleft()
+            if not idle:
+                del cls._AGENT_POOL[key]
+    
+    @classmethod
+    def clear_pool(cls):
+        """Drop all idle pooled agents"""
+        with cls._POOL_LOCK:
+            cls._AGENT_POOL.clear()
+            cls._pool_pruned_at = 0.0
+    
     async def execute_task(self, agent_id: str, task: AgentTask) -> str:
         """Execute a task with a specific agent"""
+        if task.cache:
+            key = self._result_key(task)
+            result = self._cached_result(key)
+            if result is not None:
+                logger.debug("Agent %s (%s) cache hit, skipping run", agent_id, task.agent_profile)
+                self.results[agent_id] = result
+                return result
+        
+        async with self._semaphore:
+            result = await self._run_task(agent_id, task)
+        
+        if task.cache:
+            self._store_result(key, result)
+        return result
+    
+    def _result_key(self, task: AgentTask) -> tuple:
+        _, config_key = _get_profile_config(task.agent_profile)
+        digest = hashlib.sha256(task.message.encode("utf-8")).digest()
+        # another chat must never be answered from this one's results
+        return self.context.id, config_key, digest
+    
+    @classmethod
+    def _cached_result(cls, key: tuple) -> Optional[str]:
+        with cls._RESULT_LOCK:
+            entry = cls._RESULT_CACHE.get(key)
+            if entry is None:
+                return None
+            finished_at, result = entry
+            if time.monotonic() - finished_at > RESULT_CACHE_TTL:
+                del cls._RESULT_CACHE[key]
+                return None
+            cls._RESULT_CACHE.move_to_end(key)
+            return result
+    
+    @classmethod
+    def _store_result(cls, key: tuple, result: str):
+        with cls._RESULT_LOCK:
+            cls._RESULT_CACHE[key] = (time.monotonic(), result)
+            cls._RESULT_CACHE.move_to_end(key)
+            while len(cls._RESULT_CACHE) > RESULT_CACHE_MAXSIZE:
+                cls._RESULT_CACHE.popitem(last=False)
+    
+    @classmethod
+    def clear_result_cache(cls):
+        """Forget all cached task results"""
+        with cls._RESULT_LOCK:
+            cls._RESULT_CACHE.clear()
+    
+    async def _run_task(self, agent_id: str, task: AgentTask) -> str:
         agent = self.agents.get(agent_id)
         if not agent:
             agent = self.create_agent(task.agent_profile, agent_id)
         
-        _PRINTER.print(f"Agent {agent_id} ({task.agent_profile}) executing task")
+        logger.debug("Agent %s (%s) executing task", agent_id, task.agent_profile)
         
         # Add user message to agent
         agent.hist_add_user_message(UserMessage(message=task.message, attachments=[]))
         
         # Run agent monologue
-        result = await agent.monologue()
+        try:
+            result = await agent.monologue()
+        except BaseException:
+            # a failed run leaves a dirty history, never hand it back to the pool
+            self.agents.pop(agent_id, None)
+            self._agent_keys.pop(agent_id, None)
+            raise
         
         # Store result
         self.results[agent_id] = result
         
+        # Hand the agent back for reuse by later tasks
+        self.release_agent(agent_id)
+        
         return result
     
     async def execute_sequential(self, tasks: List[AgentTask]) -> Dict[str, str]:
@@ -91,24 +332,38 @@ class MultiAgentCoordinator:
             
         return results
     
-    async def execute_parallel(self, tasks: List[AgentTask]) -> Dict[str, str]:
+    async def execute_parallel(
+        self, tasks: List[AgentTask], agent_ids: Optional[List[str]] = None
+    ) -> Dict[str, str]:
         """Execute tasks in parallel"""
         _PRINTER.print(f"Executing {len(tasks)} tasks in parallel")
         
-        # Create tasks for asyncio
-        async_tasks = []
-        agent_ids = []
-        
-        for i, task in enumerate(tasks):
-            agent_id = f"{task.agent_profile}_{i}"
-            agent_ids.append(agent_id)
-            async_tasks.append(self.execute_task(agent_id, task))
-        
-        # Execute all tasks concurrently
-        results_list = await asyncio.gather(*async_tasks)
-        
-        # Combine results
-        results = dict(zip(agent_ids, results_list))
+        # Collect results as they finish
+        finished = {}
+        
+        async def run(agent_id: str, task: AgentTask):
+            finished[agent_id] = await self.execute_task(agent_id, task)
+        
+        if agent_ids is None:
+            agent_ids = [f"{task.agent_profile}_{i}" for i, task in enumerate(tasks)]
+        
+        # Concurrency is bounded in execute_task. The first failure, or the
+        # batch deadline, cancels the remaining agents instead of letting them run on.
+        try:
+            async with asyncio.timeout(self.batch_deadline_s):
+                async with asyncio.TaskGroup() as group:
+                    for agent_id, task in zip(agent_ids, tasks):
+                        group.create_task(run(agent_id, task), name=agent_id)
+        except ExceptionGroup as errors:
+            # Surface the first failure, as asyncio.gather did, without losing the rest
+            first, *others = errors.exceptions
+            for error in others:
+                logger.warning("Parallel agent task also failed: %r", error, exc_info=error)
+                first.add_note(f"Another parallel agent task also failed: {error!r}")
+            raise first
+        
+        # Combine results in task order
+        results = {agent_id: finished[agent_id] for agent_id in agent_ids}
         
         return results
     
@@ -116,21 +371,16 @@ class MultiAgentCoordinator:
         """Execute tasks with adaptive strategy based on dependencies"""
         _PRINTER.print(f"Executing {len(tasks)} tasks with adaptive strategy")
         
-        # Separate tasks into groups based on dependencies
-        independent_tasks = [t for t in tasks if not t.depends_on]
-        dependent_tasks = [t for t in tasks if t.depends_on]
+        agent_ids = [f"{task.agent_profile}_{i}" for i, task in enumerate(tasks)]
+        waves = _dependency_waves(agent_ids, tasks)
         
+        # Each wave only depends on earlier waves, so its tasks run in parallel
         results = {}
-        
-        # Execute independent tasks in parallel
-        if independent_tasks:
-            parallel_results = await self.execute_parallel(independent_tasks)
-            results.update(parallel_results)
-        
-        # Execute dependent tasks sequentially or in waves
-        if dependent_tasks:
-            sequential_results = await self.execute_sequential(dependent_tasks)
-            results.update(sequential_results)
+        for wave in waves:
+            wave_results = await self.execute_parallel(
+                [tasks[i] for i in wave], [agent_ids[i] for i in wave]
+            )
+            results.update(wave_results)
         
         return results
     
@@ -164,12 +414,29 @@ class MultiAgentCoordinator:
         if not self.results:
             return "No results to synthesize"
         
-        synthesis = "# Multi-Agent Results\n\n"
-        
-        for agent_id, result in self.results.items():
-            synthesis += f"## {agent_id}\n\n{result}\n\n"
+        parts = ["# Multi-Agent Results\n\n"]
+        parts.extend(f"## {agent_id}\n\n{result}\n\n" for agent_id, result in self.results.items())
         
-        return synthesis
+        return "".join(parts)
+
+
+# (profile, message prefix, priority, keywords) in decomposition order
+_DECOMPOSITION_RULES = [
+    ("researcher", "Research", 1, ("research", "find", "search")),
+    ("developer", "Develop", 2, ("code", "implement", "develop")),
+    ("analyst", "Analyze", 1, ("analyze", "evaluate", "assess")),
+    ("planner", "Plan", 0, ("plan", "organize", "coordinate")),
+]
+_DECOMPOSITION_PROFILES = [rule[:3] for rule in _DECOMPOSITION_RULES]
+_KEYWORD_MAP = {
+    keyword: profile
+    for profile, _, _, keywords in _DECOMPOSITION_RULES
+    for keyword in keywords
+}
+# plain substring matching; the lookahead also reports overlapping keywords
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in _KEYWORD_MAP) + "))"
+)
 
 
 class TaskDecomposer:
@@ -183,39 +450,15 @@ class TaskDecomposer:
         """
         tasks = []
         
-        # Simple keyword-based decomposition (placeholder)
-        task_lower = task_description.lower()
-        
-        if "research" in task_lower or "find" in task_lower or "search" in task_lower:
-            if "researcher" in available_profiles:
-                tasks.append(AgentTask(
-                    agent_profile="researcher",
-                    message=f"Research: {task_description}",
-                    priority=1
-                ))
-        
-        if "code" in task_lower or "implement" in task_lower or "develop" in task_lower:
-            if "developer" in available_profiles:
-                tasks.append(AgentTask(
-                    agent_profile="developer",
-                    message=f"Develop: {task_description}",
-                    priority=2
-                ))
-        
-        if "analyze" in task_lower or "evaluate" in task_lower or "assess" in task_lower:
-            if "analyst" in available_profiles:
-                tasks.append(AgentTask(
-                    agent_profile="analyst",
-                    message=f"Analyze: {task_description}",
-                    priority=1
-                ))
+        # Simple keyword-based decomposition (placeholder), one scan for all keywords
+        found = {_KEYWORD_MAP[m.group(1)] for m in _KEYWORD_RE.finditer(task_description.lower())}
         
-        if "plan" in task_lower or "organize" in task_lower or "coordinate" in task_lower:
-            if "planner" in available_profiles:
+        for profile, prefix, priority in _DECOMPOSITION_PROFILES:
+            if profile in found and profile in available_profiles:
                 tasks.append(AgentTask(
-                    agent_profile="planner",
-                    message=f"Plan: {task_description}",
-                    priority=0
+                    agent_profile=profile,
+                    message=f"{prefix}: {task_description}",
+                    priority=priority
                 ))
         
         # If no specific tasks identified, create a general task
@@ -232,4 +475,10 @@ class TaskDecomposer:
 
 
 # Export main classes
-__all__ = ["MultiAgentCoordinator", "TaskDecomposer", "AgentTask", "CoordinationStrategy"]
+__all__ = [
+    "MultiAgentCoordinator",
+    "TaskDecomposer",
+    "AgentTask",
+    "CoordinationStrategy",
+    "invalidate_config_cache",
+]
@@ -1,8 +1,34 @@
 import os, webcolors, html
 import sys
 from datetime import datetime
+from functools import lru_cache
 from . import files
 
+
+@lru_cache(maxsize=256)
+def color_to_rgb(color: str) -> tuple[int, int, int] | None:
+    """Parse a "#RRGGBB" hex or named color, None if it is not a valid color"""
+    try:
+        if color.startswith("#") and len(color) == 7:
+            return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+        rgb_color = webcolors.name_to_rgb(color)
+        return rgb_color.red, rgb_color.green, rgb_color.blue
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _rgb_color_codes(color: str, is_background: bool) -> tuple[str, str]:
+    # ANSI and HTML color codes, built once per color
+    rgb = color_to_rgb(color)
+    if rgb is None:
+        return "", ""
+    r, g, b = rgb
+    if is_background:
+        return f"\033[48;2;{r};{g};{b}m", f"background-color: rgb({r}, {g}, {b});"
+    return f"\033[38;2;{r};{g};{b}m", f"color: rgb({r}, {g}, {b});"
+
+
 class PrintStyle:
     last_endline = True
     log_file_path = None
@@ -26,21 +52,7 @@ class PrintStyle:
                 f.write("<html><body style='background-color:black;font-family: Arial, Helvetica, sans-serif;'><pre>\n")
 
     def _get_rgb_color_code(self, color, is_background=False):
-        try:
-            if color.startswith("#") and len(color) == 7:
-                r = int(color[1:3], 16)
-                g = int(color[3:5], 16)
-                b = int(color[5:7], 16)
-            else:
-                rgb_color = webcolors.name_to_rgb(color)
-                r, g, b = rgb_color.red, rgb_color.green, rgb_color.blue
-
-            if is_background:
-                return f"\033[48;2;{r};{g};{b}m", f"background-color: rgb({r}, {g}, {b});"
-            else:
-                return f"\033[38;2;{r};{g};{b}m", f"color: rgb({r}, {g}, {b});"
-        except ValueError:
-            return "", ""
+        return _rgb_color_codes(color, is_background)
 
     def _get_styled_text(self, text):
         start = ""
@@ -1521,6 +1521,11 @@ def _apply_settings(previous: Settings | None):
                 agent.config = ctx.config
                 agent = agent.get_data(agent.DATA_NAME_SUBORDINATE)
 
+        # coordinator agents share a cached config built from the old settings
+        from python.helpers.multi_agent_coordinator import invalidate_config_cache
+
+        invalidate_config_cache()
+
         # reload whisper model if necessary
         if not previous or _settings["stt_model_size"] != previous["stt_model_size"]:
             task = defer.DeferredTask().start_task(
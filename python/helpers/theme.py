@@ -14,10 +14,20 @@ Features:
 
 import json
 import os
-from typing import Dict, Optional, Any, List
-from dataclasses import dataclass, asdict, field
+import threading
+from types import MappingProxyType
+from typing import Dict, Optional, Any, List, Mapping
+from dataclasses import dataclass, field, fields
 from enum import Enum
+from functools import cache, lru_cache
 from python.helpers import files
+from python.helpers.print_style import color_to_rgb
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 class ThemeName(Enum):
@@ -33,7 +43,11 @@ class ThemeName(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+_THEME_BY_NAME: Dict[str, ThemeName] = {theme.value: theme for theme in ThemeName}
+_SELECTABLE_THEMES = tuple(theme.value for theme in ThemeName if theme != ThemeName.CUSTOM)
+
+
+@dataclass(frozen=True, slots=True)
 class ColorPalette:
     """
     Color palette for a theme.
@@ -89,9 +103,17 @@ class ColorPalette:
     # Links and references
     link: str = "#00CED1"  # Dark turquoise
     reference: str = "#BA55D3"  # Medium orchid
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Component -> color dict, a flat and cheaper asdict()"""
+        return {name: getattr(self, name) for name in _PALETTE_FIELDS}
 
 
-@dataclass
+_PALETTE_FIELDS = tuple(f.name for f in fields(ColorPalette))
+_PALETTE_FIELD_SET = frozenset(_PALETTE_FIELDS)
+
+
+@dataclass(frozen=True, slots=True)
 class Theme:
     """
     Complete theme definition including palette and styling preferences.
@@ -114,6 +136,111 @@ class Theme:
     show_timestamps: bool = False
 
 
+# Built-in palettes ship as a data file, read on first use so that
+# importing this module parses no theme data
+BUILTIN_THEMES_PATH = "conf/builtin_themes.json"
+
+
+@lru_cache(maxsize=1)
+def _builtin_palette_data() -> Dict[str, Dict[str, str]]:
+    """Raw field values of all built-in palettes, keyed by theme name"""
+    return _read_json(files.get_abs_path(BUILTIN_THEMES_PATH))
+
+
+@lru_cache(maxsize=None)
+def _builtin_palette(theme_name: ThemeName) -> Optional[ColorPalette]:
+    """Build (once) and return the palette of a built-in theme"""
+    data = _builtin_palette_data().get(theme_name.value)
+    return ColorPalette(**data) if data is not None else None
+
+
+@lru_cache(maxsize=32)
+def _palette_colors(palette: ColorPalette) -> Mapping[str, str]:
+    """Read-only component -> color view of a palette"""
+    return MappingProxyType(palette.to_dict())
+
+
+@lru_cache(maxsize=32)
+def _palette_rgb(palette: ColorPalette) -> Mapping[str, Optional[tuple[int, int, int]]]:
+    """Read-only component -> (r, g, b) view of a palette, parsed once"""
+    return MappingProxyType({
+        component: color_to_rgb(color)
+        for component, color in _palette_colors(palette).items()
+    })
+
+
+RESET = "\033[0m"
+_DEFAULT_ANSI_FG = "\033[38;2;255;255;255m"
+_DEFAULT_ANSI_BG = "\033[48;2;255;255;255m"
+
+
+@lru_cache(maxsize=64)
+def _palette_ansi(palette: ColorPalette, background: bool) -> Mapping[str, str]:
+    """Read-only component -> ANSI truecolor escape view of a palette"""
+    code = 48 if background else 38
+    return MappingProxyType({
+        component: f"\033[{code};2;{rgb[0]};{rgb[1]};{rgb[2]}m" if rgb else ""
+        for component, rgb in _palette_rgb(palette).items()
+    })
+
+
+def _read_json(path: str) -> Any:
+    # theme files are tiny, read them unbuffered in one go
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while chunk := os.read(fd, max(size, 4096)):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    data = b''.join(chunks)
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _dump_json(data: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _theme_from_dict(data: Dict[str, Any], default_name: str) -> Theme:
+    """Rebuild a Theme from its JSON document"""
+    palette_data = data.get('palette', {})
+    unknown = palette_data.keys() - _PALETTE_FIELD_SET
+    if unknown:
+        # Ignore fields from other versions instead of rejecting the whole theme
+        print(f"Warning: Ignoring unknown theme palette keys: {', '.join(sorted(unknown))}")
+        palette_data = {k: v for k, v in palette_data.items() if k in _PALETTE_FIELD_SET}
+    
+    return Theme(
+        name=data.get('name', default_name),
+        palette=ColorPalette(**palette_data),
+        bold_headings=data.get('bold_headings', True),
+        italic_thoughts=data.get('italic_thoughts', True),
+        underline_links=data.get('underline_links', True),
+        padding_messages=data.get('padding_messages', True),
+        show_timestamps=data.get('show_timestamps', False),
+    )
+
+
+def _serialize_theme(theme: Theme) -> bytes:
+    """JSON document for a theme, as written by save and export"""
+    return _dump_json({
+        'name': theme.name,
+        'palette': theme.palette.to_dict(),
+        'bold_headings': theme.bold_headings,
+        'italic_thoughts': theme.italic_thoughts,
+        'underline_links': theme.underline_links,
+        'padding_messages': theme.padding_messages,
+        'show_timestamps': theme.show_timestamps,
+    })
+
+
+# Parsed theme files: path -> ((mtime_ns, size), theme)
+_THEME_FILE_CACHE: Dict[str, tuple[tuple[int, int], Theme]] = {}
+
+
 class ThemeManager:
     """
     Manages themes and user preferences.
@@ -126,249 +253,6 @@ class ThemeManager:
     - Apply themes to PrintStyle
     """
     
-    # Built-in themes
-    BUILTIN_THEMES: Dict[ThemeName, ColorPalette] = {
-        ThemeName.DARK: ColorPalette(
-            primary="#00BFFF",
-            secondary="#32CD32",
-            accent="#FFD700",
-            background="#000000",
-            foreground="#FFFFFF",
-            user_message="#87CEEB",
-            agent_message="#98FB98",
-            system_message="#FFE4B5",
-            success="#00FF00",
-            warning="#FFA500",
-            error="#FF0000",
-            info="#0000FF",
-            debug="#808080",
-            tool_execution="#9370DB",
-            code_execution="#4682B4",
-            code_output="#B0C4DE",
-            memory_save="#FFB6C1",
-            memory_load="#DDA0DD",
-            knowledge="#F0E68C",
-            reasoning="#b3ffd9",
-            thoughts="#ADD8E6",
-            highlight="#FFFF00",
-            emphasis="#FF69B4",
-            border="#696969",
-            separator="#A9A9A9",
-            link="#00CED1",
-            reference="#BA55D3",
-        ),
-        
-        ThemeName.LIGHT: ColorPalette(
-            primary="#0066CC",
-            secondary="#228B22",
-            accent="#DAA520",
-            background="#FFFFFF",
-            foreground="#000000",
-            user_message="#4682B4",
-            agent_message="#2E8B57",
-            system_message="#8B4513",
-            success="#006400",
-            warning="#FF8C00",
-            error="#DC143C",
-            info="#00008B",
-            debug="#696969",
-            tool_execution="#8A2BE2",
-            code_execution="#191970",
-            code_output="#4169E1",
-            memory_save="#C71585",
-            memory_load="#9932CC",
-            knowledge="#B8860B",
-            reasoning="#2E8B57",
-            thoughts="#4169E1",
-            highlight="#FFD700",
-            emphasis="#FF1493",
-            border="#A9A9A9",
-            separator="#D3D3D3",
-            link="#0000EE",
-            reference="#8B008B",
-        ),
-        
-        ThemeName.SOLARIZED_DARK: ColorPalette(
-            primary="#268BD2",  # Solarized blue
-            secondary="#859900",  # Solarized green
-            accent="#CB4B16",  # Solarized orange
-            background="#002B36",  # Solarized base03
-            foreground="#839496",  # Solarized base0
-            user_message="#268BD2",
-            agent_message="#859900",
-            system_message="#B58900",  # Solarized yellow
-            success="#859900",
-            warning="#CB4B16",
-            error="#DC322F",  # Solarized red
-            info="#268BD2",
-            debug="#586E75",  # Solarized base01
-            tool_execution="#6C71C4",  # Solarized violet
-            code_execution="#2AA198",  # Solarized cyan
-            code_output="#93A1A1",  # Solarized base1
-            memory_save="#D33682",  # Solarized magenta
-            memory_load="#6C71C4",
-            knowledge="#B58900",
-            reasoning="#859900",
-            thoughts="#268BD2",
-            highlight="#B58900",
-            emphasis="#D33682",
-            border="#073642",  # Solarized base02
-            separator="#586E75",
-            link="#2AA198",
-            reference="#6C71C4",
-        ),
-        
-        ThemeName.SOLARIZED_LIGHT: ColorPalette(
-            primary="#268BD2",  # Solarized blue
-            secondary="#859900",  # Solarized green
-            accent="#CB4B16",  # Solarized orange
-            background="#FDF6E3",  # Solarized base3
-            foreground="#657B83",  # Solarized base00
-            user_message="#268BD2",
-            agent_message="#859900",
-            system_message="#B58900",  # Solarized yellow
-            success="#859900",
-            warning="#CB4B16",
-            error="#DC322F",  # Solarized red
-            info="#268BD2",
-            debug="#93A1A1",  # Solarized base1
-            tool_execution="#6C71C4",  # Solarized violet
-            code_execution="#2AA198",  # Solarized cyan
-            code_output="#586E75",  # Solarized base01
-            memory_save="#D33682",  # Solarized magenta
-            memory_load="#6C71C4",
-            knowledge="#B58900",
-            reasoning="#859900",
-            thoughts="#268BD2",
-            highlight="#B58900",
-            emphasis="#D33682",
-            border="#EEE8D5",  # Solarized base2
-            separator="#93A1A1",
-            link="#2AA198",
-            reference="#6C71C4",
-        ),
-        
-        ThemeName.MONOKAI: ColorPalette(
-            primary="#66D9EF",  # Monokai blue
-            secondary="#A6E22E",  # Monokai green
-            accent="#FD971F",  # Monokai orange
-            background="#272822",  # Monokai background
-            foreground="#F8F8F2",  # Monokai foreground
-            user_message="#66D9EF",
-            agent_message="#A6E22E",
-            system_message="#E6DB74",  # Monokai yellow
-            success="#A6E22E",
-            warning="#FD971F",
-            error="#F92672",  # Monokai pink/red
-            info="#66D9EF",
-            debug="#75715E",  # Monokai comment
-            tool_execution="#AE81FF",  # Monokai purple
-            code_execution="#66D9EF",
-            code_output="#F8F8F2",
-            memory_save="#F92672",
-            memory_load="#AE81FF",
-            knowledge="#E6DB74",
-            reasoning="#A6E22E",
-            thoughts="#66D9EF",
-            highlight="#E6DB74",
-            emphasis="#F92672",
-            border="#49483E",
-            separator="#75715E",
-            link="#66D9EF",
-            reference="#AE81FF",
-        ),
-        
-        ThemeName.DRACULA: ColorPalette(
-            primary="#8BE9FD",  # Cyan
-            secondary="#50FA7B",  # Green
-            accent="#FFB86C",  # Orange
-            background="#282A36",  # Background
-            foreground="#F8F8F2",  # Foreground
-            user_message="#8BE9FD",
-            agent_message="#50FA7B",
-            system_message="#F1FA8C",  # Yellow
-            success="#50FA7B",
-            warning="#FFB86C",
-            error="#FF5555",  # Red
-            info="#8BE9FD",
-            debug="#6272A4",  # Comment
-            tool_execution="#BD93F9",  # Purple
-            code_execution="#8BE9FD",
-            code_output="#F8F8F2",
-            memory_save="#FF79C6",  # Pink
-            memory_load="#BD93F9",
-            knowledge="#F1FA8C",
-            reasoning="#50FA7B",
-            thoughts="#8BE9FD",
-            highlight="#F1FA8C",
-            emphasis="#FF79C6",
-            border="#44475A",
-            separator="#6272A4",
-            link="#8BE9FD",
-            reference="#BD93F9",
-        ),
-        
-        ThemeName.NORD: ColorPalette(
-            primary="#88C0D0",  # Nord frost cyan
-            secondary="#A3BE8C",  # Nord aurora green
-            accent="#EBCB8B",  # Nord aurora yellow
-            background="#2E3440",  # Nord polar night
-            foreground="#ECEFF4",  # Nord snow storm
-            user_message="#88C0D0",
-            agent_message="#A3BE8C",
-            system_message="#EBCB8B",
-            success="#A3BE8C",
-            warning="#EBCB8B",
-            error="#BF616A",  # Nord aurora red
-            info="#88C0D0",
-            debug="#4C566A",  # Nord polar night lighter
-            tool_execution="#B48EAD",  # Nord aurora purple
-            code_execution="#81A1C1",  # Nord frost blue
-            code_output="#D8DEE9",  # Nord snow storm darker
-            memory_save="#BF616A",
-            memory_load="#B48EAD",
-            knowledge="#EBCB8B",
-            reasoning="#A3BE8C",
-            thoughts="#88C0D0",
-            highlight="#EBCB8B",
-            emphasis="#BF616A",
-            border="#3B4252",
-            separator="#4C566A",
-            link="#88C0D0",
-            reference="#B48EAD",
-        ),
-        
-        ThemeName.GRUVBOX: ColorPalette(
-            primary="#83A598",  # Gruvbox blue
-            secondary="#B8BB26",  # Gruvbox green
-            accent="#FABD2F",  # Gruvbox yellow
-            background="#282828",  # Gruvbox dark background
-            foreground="#EBDBB2",  # Gruvbox foreground
-            user_message="#83A598",
-            agent_message="#B8BB26",
-            system_message="#FABD2F",
-            success="#B8BB26",
-            warning="#FE8019",  # Gruvbox orange
-            error="#FB4934",  # Gruvbox red
-            info="#83A598",
-            debug="#928374",  # Gruvbox gray
-            tool_execution="#D3869B",  # Gruvbox purple
-            code_execution="#8EC07C",  # Gruvbox aqua
-            code_output="#D5C4A1",  # Gruvbox light foreground
-            memory_save="#FB4934",
-            memory_load="#D3869B",
-            knowledge="#FABD2F",
-            reasoning="#B8BB26",
-            thoughts="#83A598",
-            highlight="#FABD2F",
-            emphasis="#FB4934",
-            border="#3C3836",
-            separator="#665C54",
-            link="#8EC07C",
-            reference="#D3869B",
-        ),
-    }
-    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize the theme manager.
@@ -380,28 +264,22 @@ class ThemeManager:
             config_path = files.get_abs_path("conf", "theme.json")
         
         self.config_path = config_path
+        self._created_dir: Optional[str] = None
         self.current_theme: Theme = self._load_theme()
+        self._rebuild_caches()
     
     def _load_theme(self) -> Theme:
         """Load theme from configuration file or use default"""
         try:
-            with open(self.config_path, 'r') as f:
-                data = json.load(f)
-            
-            # Reconstruct ColorPalette from saved data
-            palette_data = data.get('palette', {})
-            palette = ColorPalette(**palette_data)
+            # Reuse the parsed theme while the file is unchanged
+            stat = os.stat(self.config_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = _THEME_FILE_CACHE.get(self.config_path)
+            if cached and cached[0] == signature:
+                return cached[1]
             
-            # Reconstruct Theme
-            theme = Theme(
-                name=data.get('name', 'custom'),
-                palette=palette,
-                bold_headings=data.get('bold_headings', True),
-                italic_thoughts=data.get('italic_thoughts', True),
-                underline_links=data.get('underline_links', True),
-                padding_messages=data.get('padding_messages', True),
-                show_timestamps=data.get('show_timestamps', False),
-            )
+            theme = _theme_from_dict(_read_json(self.config_path), 'custom')
+            _THEME_FILE_CACHE[self.config_path] = (signature, theme)
             return theme
         except (FileNotFoundError, json.JSONDecodeError, TypeError) as e:
             print(f"Warning: Failed to load theme configuration: {e}")
@@ -411,7 +289,7 @@ class ThemeManager:
         """Get the default theme (dark)"""
         return Theme(
             name=ThemeName.DARK.value,
-            palette=self.BUILTIN_THEMES[ThemeName.DARK]
+            palette=_builtin_palette(ThemeName.DARK)
         )
     
     def save_theme(self, theme: Optional[Theme] = None):
@@ -425,21 +303,38 @@ class ThemeManager:
             theme = self.current_theme
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
+        config_dir = os.path.dirname(self.config_path)
+        if config_dir != self._created_dir:
+            os.makedirs(config_dir, exist_ok=True)
+            self._created_dir = config_dir
         
-        # Convert to dict for JSON serialization
-        theme_dict = {
-            'name': theme.name,
-            'palette': asdict(theme.palette),
-            'bold_headings': theme.bold_headings,
-            'italic_thoughts': theme.italic_thoughts,
-            'underline_links': theme.underline_links,
-            'padding_messages': theme.padding_messages,
-            'show_timestamps': theme.show_timestamps,
-        }
+        # Write a temp file and swap it in so readers never see a partial file
+        tmp_path = f"{self.config_path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_serialize_theme(theme))
+            os.replace(tmp_path, self.config_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         
-        with open(self.config_path, 'w') as f:
-            json.dump(theme_dict, f, indent=2)
+        stat = os.stat(self.config_path)
+        _THEME_FILE_CACHE[self.config_path] = ((stat.st_mtime_ns, stat.st_size), theme)
+    
+    def _set_theme(self, theme: Theme):
+        """Make a theme current and drop colors cached for the previous one"""
+        self.current_theme = theme
+        self._rebuild_caches()
+        get_color.cache_clear()
+    
+    def _rebuild_caches(self):
+        """Point the lookup tables at the current palette (shared per palette)"""
+        palette = self.current_theme.palette
+        self._colors = _palette_colors(palette)
+        self._rgb = _palette_rgb(palette)
+        self._ansi_fg = _palette_ansi(palette, False)
+        self._ansi_bg = _palette_ansi(palette, True)
     
     def switch_theme(self, theme_name: str) -> bool:
         """
@@ -453,16 +348,17 @@ class ThemeManager:
         """
         try:
             # Try to match with built-in themes
-            for theme_enum in ThemeName:
-                if theme_enum.value == theme_name:
-                    palette = self.BUILTIN_THEMES.get(theme_enum)
-                    if palette:
-                        self.current_theme = Theme(
-                            name=theme_name,
-                            palette=palette
-                        )
-                        self.save_theme()
-                        return True
+            theme_enum = _THEME_BY_NAME.get(theme_name)
+            palette = _builtin_palette(theme_enum) if theme_enum else None
+            if palette:
+                theme = Theme(name=theme_name, palette=palette)
+                # Nothing to do if this theme is already current and saved
+                cached = _THEME_FILE_CACHE.get(self.config_path)
+                if theme == self.current_theme and cached and cached[1] == theme:
+                    return True
+                self._set_theme(theme)
+                self.save_theme()
+                return True
             
             return False
         except Exception as e:
@@ -479,11 +375,38 @@ class ThemeManager:
         Returns:
             Color code (hex or name)
         """
-        return getattr(self.current_theme.palette, component, "#FFFFFF")
+        return self._colors.get(component, "#FFFFFF")
+    
+    def get_rgb(self, component: str) -> Optional[tuple[int, int, int]]:
+        """
+        Get the parsed RGB color for a specific component.
+        
+        Args:
+            component: Component name (e.g., "user_message", "error")
+            
+        Returns:
+            (r, g, b) tuple, or None if the configured color is not valid
+        """
+        return self._rgb.get(component, (255, 255, 255))
+    
+    def get_ansi(self, component: str, bg: bool = False) -> str:
+        """
+        Get the ANSI truecolor escape for a specific component.
+        
+        Args:
+            component: Component name (e.g., "user_message", "error")
+            bg: Return the background escape instead of the foreground one
+            
+        Returns:
+            Escape sequence, empty if the configured color is not valid
+        """
+        if bg:
+            return self._ansi_bg.get(component, _DEFAULT_ANSI_BG)
+        return self._ansi_fg.get(component, _DEFAULT_ANSI_FG)
     
     def list_themes(self) -> List[str]:
         """Get list of available theme names"""
-        return [theme.value for theme in ThemeName if theme != ThemeName.CUSTOM]
+        return list(_SELECTABLE_THEMES)
     
     def export_theme(self, output_path: str):
         """
@@ -492,18 +415,8 @@ class ThemeManager:
         Args:
             output_path: Path to save the exported theme
         """
-        theme_dict = {
-            'name': self.current_theme.name,
-            'palette': asdict(self.current_theme.palette),
-            'bold_headings': self.current_theme.bold_headings,
-            'italic_thoughts': self.current_theme.italic_thoughts,
-            'underline_links': self.current_theme.underline_links,
-            'padding_messages': self.current_theme.padding_messages,
-            'show_timestamps': self.current_theme.show_timestamps,
-        }
-        
-        with open(output_path, 'w') as f:
-            json.dump(theme_dict, f, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(_serialize_theme(self.current_theme))
     
     def import_theme(self, input_path: str) -> bool:
         """
@@ -516,22 +429,8 @@ class ThemeManager:
             True if successful, False otherwise
         """
         try:
-            with open(input_path, 'r') as f:
-                data = json.load(f)
-            
-            palette_data = data.get('palette', {})
-            palette = ColorPalette(**palette_data)
-            
-            self.current_theme = Theme(
-                name=data.get('name', 'imported'),
-                palette=palette,
-                bold_headings=data.get('bold_headings', True),
-                italic_thoughts=data.get('italic_thoughts', True),
-                underline_links=data.get('underline_links', True),
-                padding_messages=data.get('padding_messages', True),
-                show_timestamps=data.get('show_timestamps', False),
-            )
-            
+            # Parsed once here and serialized once by save_theme
+            self._set_theme(_theme_from_dict(_read_json(input_path), 'imported'))
             self.save_theme()
             return True
         except Exception as e:
@@ -541,6 +440,7 @@ class ThemeManager:
 
 # Global theme manager instance
 _global_theme_manager: Optional[ThemeManager] = None
+_global_theme_lock = threading.Lock()
 
 
 def get_theme_manager() -> ThemeManager:
@@ -551,14 +451,20 @@ def get_theme_manager() -> ThemeManager:
         The global ThemeManager instance
     """
     global _global_theme_manager
-    if _global_theme_manager is None:
-        _global_theme_manager = ThemeManager()
-    return _global_theme_manager
+    manager = _global_theme_manager
+    if manager is None:
+        with _global_theme_lock:
+            if _global_theme_manager is None:
+                _global_theme_manager = ThemeManager()
+            manager = _global_theme_manager
+    return manager
 
 
+@cache
 def get_color(component: str) -> str:
     """
     Convenience function to get a color for a component.
+    Results are cached until the theme changes.
     
     Args:
         component: Component name
@@ -30,16 +30,21 @@ This module implements advanced tool management and optimization:
 """
 
 import asyncio
+import fnmatch
+import graphlib
 import hashlib
 import json
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple, Callable
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Callable
 import inspect
 
+import numpy as np
+
 from python.helpers.print_style import PrintStyle
 from python.helpers import files
 
@@ -52,7 +57,7 @@ class CacheStrategy(Enum):
     TIME_BASED = "time_based"  # Cache with TTL
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResult:
     """Enhanced tool result with metadata"""
     result: Any
@@ -63,25 +68,35 @@ class ToolResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
+class CacheEntry:
+    """Cached tool result; mutated in place on every hit"""
+    result: Any
+    timestamp: float  # time.monotonic() at store time
+    tool_name: str = ""
+    resources: Tuple[str, ...] = ()
+    access_count: int = 1
+
+
+@dataclass(slots=True)
 class ToolExecution:
     """Tool execution record"""
     tool_name: str
     args: Dict[str, Any]
     result: Optional[ToolResult] = None
-    start_time: Optional[datetime] = None
-    end_time: Optional[datetime] = None
+    start_time: Optional[float] = None  # time.monotonic()
+    end_time: Optional[float] = None  # time.monotonic()
     error: Optional[str] = None
     
     @property
     def duration(self) -> float:
         """Get execution duration in seconds"""
-        if self.start_time and self.end_time:
-            return (self.end_time - self.start_time).total_seconds()
+        if self.start_time is not None and self.end_time is not None:
+            return self.end_time - self.start_time
         return 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolMetrics:
     """Performance metrics for a tool"""
     tool_name: str
@@ -92,12 +107,12 @@ class ToolMetrics:
     average_execution_time: float = 0.0
     cache_hits: int = 0
     cache_misses: int = 0
-    last_used: Optional[datetime] = None
+    last_used: Optional[float] = None  # wall-clock time.time()
     
     def update(self, execution: ToolExecution):
         """Update metrics with a new execution"""
         self.total_calls += 1
-        self.last_used = datetime.now(timezone.utc)
+        self.last_used = time.time()
         
         if execution.result and execution.result.success:
             self.successful_calls += 1
@@ -150,11 +165,12 @@ class ToolCache:
         self.default_ttl = default_ttl
         self.enable_compression = enable_compression
         
-        # Cache storage: key -> (result, timestamp, access_count)
-        self.cache: Dict[str, Tuple[Any, datetime, int]] = {}
+        # Cache storage in LRU order: key digest -> entry
+        self.cache: OrderedDict[bytes, CacheEntry] = OrderedDict()
         
-        # LRU tracking
-        self.access_order: deque = deque()
+        # Invalidation indexes: tool name / resource -> cache keys
+        self.tool_to_keys: Dict[str, Set[bytes]] = defaultdict(set)
+        self.resource_to_keys: Dict[str, Set[bytes]] = defaultdict(set)
         
         # TTL configuration per tool
         self.tool_ttls: Dict[str, int] = {}
@@ -172,7 +188,7 @@ class ToolCache:
         tool_name: str,
         args: Dict[str, Any],
         context: Optional[str] = None,
-    ) -> str:
+    ) -> bytes:
         """
         Generate a unique cache key for tool execution.
         
@@ -182,16 +198,20 @@ class ToolCache:
             context: Optional context for cache key
             
         Returns:
-            Cache key string
+            8-byte BLAKE2b digest, used directly as the dict key
         """
-        # Sort args for consistent hashing
-        sorted_args = json.dumps(args, sort_keys=True)
-        key_data = f"{tool_name}:{sorted_args}"
+        # Sort args for consistent hashing; flat scalar args skip the JSON encoder
+        try:
+            items = tuple(sorted(args.items()))
+            hash(items)
+            sorted_args = repr(items)
+        except TypeError:
+            sorted_args = json.dumps(args, sort_keys=True, default=str)
+        h = hashlib.blake2b(f"{tool_name}:{sorted_args}".encode(), digest_size=8)
         if context:
-            key_data += f":{context}"
-        
-        # Use hash for shorter keys
-        return hashlib.md5(key_data.encode()).hexdigest()
+            h.update(b":")
+            h.update(context.encode())
+        return h.digest()
     
     def get(
         self,
@@ -212,29 +232,25 @@ class ToolCache:
         """
         cache_key = self._generate_cache_key(tool_name, args, context)
         
-        if cache_key not in self.cache:
+        entry = self.cache.get(cache_key)
+        if entry is None:
             self.stats["misses"] += 1
             return None
         
-        result, timestamp, access_count = self.cache[cache_key]
-        
         # Check TTL
         ttl = self.tool_ttls.get(tool_name, self.default_ttl)
-        age = (datetime.now(timezone.utc) - timestamp).total_seconds()
-        
-        if age > ttl:
+        if time.monotonic() - entry.timestamp > ttl:
             # Expired
-            del self.cache[cache_key]
+            self._remove(cache_key)
             self.stats["misses"] += 1
             return None
         
         # Update access tracking
-        self.cache[cache_key] = (result, timestamp, access_count + 1)
-        self.access_order.remove(cache_key) if cache_key in self.access_order else None
-        self.access_order.append(cache_key)
+        entry.access_count += 1
+        self.cache.move_to_end(cache_key)
         
         self.stats["hits"] += 1
-        return result
+        return entry.result
     
     def put(
         self,
@@ -243,6 +259,7 @@ class ToolCache:
         result: Any,
         context: Optional[str] = None,
         ttl: Optional[int] = None,
+        resources: Optional[Iterable[str]] = None,
     ):
         """
         Cache a tool result.
@@ -253,6 +270,8 @@ class ToolCache:
             result: Result to cache
             context: Optional context
             ttl: Optional custom TTL
+            resources: Resources the result was read from, for
+                invalidate_by_dependency
         """
         cache_key = self._generate_cache_key(tool_name, args, context)
         
@@ -260,47 +279,103 @@ class ToolCache:
         if ttl is not None:
             self.tool_ttls[tool_name] = ttl
         
-        # Evict if at capacity
-        if len(self.cache) >= self.max_size:
-            self._evict_lru()
-        
         # Store result
-        self.cache[cache_key] = (result, datetime.now(timezone.utc), 1)
-        self.access_order.append(cache_key)
+        if cache_key in self.cache:
+            self._remove(cache_key)
+        entry = CacheEntry(
+            result, time.monotonic(), tool_name, tuple(resources or ())
+        )
+        self.cache[cache_key] = entry
+        self.tool_to_keys[tool_name].add(cache_key)
+        for resource in entry.resources:
+            self.resource_to_keys[resource].add(cache_key)
+        
+        # Evict if over capacity
+        while len(self.cache) > self.max_size:
+            self._evict_lru()
     
     def _evict_lru(self):
         """Evict least recently used entry"""
-        if not self.access_order:
-            return
-        
-        lru_key = self.access_order.popleft()
-        if lru_key in self.cache:
-            del self.cache[lru_key]
+        if self.cache:
+            self._remove(next(iter(self.cache)))
             self.stats["evictions"] += 1
     
+    def _remove(self, cache_key: bytes):
+        """Drop an entry and its invalidation index references"""
+        entry = self.cache.pop(cache_key, None)
+        if entry is None:
+            return
+        self._unindex(self.tool_to_keys, entry.tool_name, cache_key)
+        for resource in entry.resources:
+            self._unindex(self.resource_to_keys, resource, cache_key)
+    
+    @staticmethod
+    def _unindex(index: Dict[str, Set[bytes]], name: str, cache_key: bytes):
+        keys = index.get(name)
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del index[name]
+    
+    def _remove_keys(self, keys: Iterable[bytes]) -> int:
+        """Drop the given entries and return how many were removed"""
+        count = 0
+        for cache_key in list(keys):
+            if cache_key in self.cache:
+                self._remove(cache_key)
+                count += 1
+        self.stats["invalidations"] += count
+        return count
+    
     def invalidate(
         self,
         tool_name: Optional[str] = None,
         pattern: Optional[str] = None,
-    ):
+    ) -> int:
         """
-        Invalidate cached entries.
+        Invalidate cached entries. With no arguments the whole cache is cleared.
         
         Args:
             tool_name: Invalidate all entries for this tool
-            pattern: Invalidate entries matching pattern
+            pattern: Invalidate entries of tools whose name matches this
+                fnmatch pattern, e.g. "search_*"
+            
+        Returns:
+            Number of entries removed
         """
-        if tool_name:
-            # Invalidate by tool name (requires storing tool names with keys)
-            # For simplicity, clear entire cache
+        if tool_name is None and pattern is None:
             count = len(self.cache)
             self.cache.clear()
-            self.access_order.clear()
+            self.tool_to_keys.clear()
+            self.resource_to_keys.clear()
             self.stats["invalidations"] += count
+        else:
+            names = set()
+            if tool_name is not None:
+                names.add(tool_name)
+            if pattern is not None:
+                names.update(fnmatch.filter(self.tool_to_keys, pattern))
+            count = self._remove_keys(
+                key for name in names for key in self.tool_to_keys.get(name, ())
+            )
         
         PrintStyle(font_color="yellow").print(
-            f"Invalidated cache entries"
+            f"Invalidated {count} cache entries"
         )
+        return count
+    
+    def invalidate_by_dependency(self, resource: str) -> int:
+        """
+        Invalidate cached results that were read from a resource, e.g. after
+        a tool wrote to that file.
+        
+        Args:
+            resource: Resource name as declared when the result was cached
+            
+        Returns:
+            Number of entries removed
+        """
+        return self._remove_keys(self.resource_to_keys.get(resource, ()))
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -315,6 +390,57 @@ class ToolCache:
         }
 
 
+# Resource declaration that opts a tool out of locking entirely
+NO_RESOURCES = "none"
+
+
+class ResourceLockManager:
+    """
+    Per-resource locks for tools running concurrently.
+    
+    Resources are acquired in sorted order so tools sharing several resources
+    cannot deadlock; asyncio.Lock wakes waiters in FIFO order. A lock is
+    dropped once no execution holds or waits for it.
+    """
+    
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refcounts: Dict[str, int] = defaultdict(int)
+    
+    @asynccontextmanager
+    async def acquire(self, resources: Iterable[str]) -> AsyncIterator[None]:
+        """
+        Hold the locks for all given resources.
+        
+        Args:
+            resources: Resource names, e.g. file paths or terminal ids
+        """
+        keys = sorted(set(resources))
+        for key in keys:
+            self._refcounts[key] += 1
+            if key not in self._locks:
+                self._locks[key] = asyncio.Lock()
+        
+        acquired: List[asyncio.Lock] = []
+        try:
+            for key in keys:
+                lock = self._locks[key]
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+            for key in keys:
+                self._refcounts[key] -= 1
+                if not self._refcounts[key]:
+                    del self._refcounts[key]
+                    del self._locks[key]
+    
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
 class ToolOptimizer:
     """
     Advanced tool optimization and management system.
@@ -330,6 +456,12 @@ class ToolOptimizer:
         self.agent = agent
         self.cache = ToolCache()
         self.metrics: Dict[str, ToolMetrics] = {}
+        
+        # Columnar mirror of the metrics used for scoring, one row per tool:
+        # success rate, last used (epoch seconds), average time, total calls
+        self._metric_rows: Dict[str, int] = {}
+        self._metric_names: List[str] = []
+        self._metric_columns = np.zeros((4, 16), dtype=np.float64)
         self.execution_history: deque = deque(maxlen=1000)
         
         # Tool capabilities registry
@@ -340,7 +472,7 @@ class ToolOptimizer:
         
         # Parallel execution pool
         self.max_parallel_tools = 5
-        self.active_executions: Set[asyncio.Task] = set()
+        self.resource_locks = ResourceLockManager()
     
     async def execute_tool_optimized(
         self,
@@ -349,6 +481,7 @@ class ToolOptimizer:
         use_cache: bool = True,
         cache_ttl: Optional[int] = None,
         context: Optional[str] = None,
+        declared_resources: Optional[List[str]] = None,
     ) -> ToolResult:
         """
         Execute a tool with optimization (caching, metrics, etc.).
@@ -359,18 +492,21 @@ class ToolOptimizer:
             use_cache: Whether to use caching
             cache_ttl: Optional cache TTL
             context: Optional execution context
+            declared_resources: Shared resources the tool touches; executions
+                sharing a resource run one at a time. None locks the whole
+                tool, ["none"] skips locking.
             
         Returns:
             ToolResult with execution details
         """
         execution = ToolExecution(tool_name=tool_name, args=args)
-        execution.start_time = datetime.now(timezone.utc)
+        execution.start_time = time.monotonic()
         
         # Check cache
         if use_cache:
             cached_result = self.cache.get(tool_name, args, context)
             if cached_result is not None:
-                execution.end_time = datetime.now(timezone.utc)
+                execution.end_time = time.monotonic()
                 execution.result = ToolResult(
                     result=cached_result,
                     success=True,
@@ -382,7 +518,7 @@ class ToolOptimizer:
         
         # Execute tool
         try:
-            start = time.time()
+            start = time.monotonic()
             
             # Get tool instance and execute
             tool = self.agent.get_tool(
@@ -394,7 +530,10 @@ class ToolOptimizer:
             )
             
             if tool:
-                response = await tool.execute(**args)
+                async with self.resource_locks.acquire(
+                    self._lock_keys(tool_name, declared_resources)
+                ):
+                    response = await tool.execute(**args)
                 result = response.message if hasattr(response, 'message') else str(response)
                 success = True
             else:
@@ -402,7 +541,7 @@ class ToolOptimizer:
                 success = False
                 execution.error = f"Tool {tool_name} not found"
             
-            execution_time = time.time() - start
+            execution_time = time.monotonic() - start
             
             execution.result = ToolResult(
                 result=result,
@@ -413,7 +552,10 @@ class ToolOptimizer:
             
             # Cache result if successful
             if success and use_cache:
-                self.cache.put(tool_name, args, result, context, cache_ttl)
+                self.cache.put(
+                    tool_name, args, result, context, cache_ttl,
+                    resources=[r for r in declared_resources or () if r != NO_RESOURCES],
+                )
             
         except Exception as e:
             execution.error = str(e)
@@ -426,48 +568,62 @@ class ToolOptimizer:
                 f"Tool execution error: {e}"
             )
         
-        execution.end_time = datetime.now(timezone.utc)
+        execution.end_time = time.monotonic()
         self._update_metrics(execution)
         self.execution_history.append(execution)
         
         return execution.result
     
+    @staticmethod
+    def _lock_keys(tool_name: str, declared_resources: Optional[List[str]]) -> List[str]:
+        """Resolve a tool's resource declaration to lock keys"""
+        if declared_resources is None:
+            return [f"tool:{tool_name}"]
+        return [r for r in declared_resources if r != NO_RESOURCES]
+    
     async def execute_tools_parallel(
         self,
-        tool_specs: List[Tuple[str, Dict[str, Any]]],
+        tool_specs: List[Tuple],
         max_parallel: Optional[int] = None,
+        deps: Optional[Dict[int, Set[int]]] = None,
     ) -> List[ToolResult]:
         """
-        Execute multiple independent tools in parallel.
+        Execute multiple tools in parallel.
         
         Args:
-            tool_specs: List of (tool_name, args) tuples
+            tool_specs: List of (tool_name, args) or
+                (tool_name, args, declared_resources) tuples
             max_parallel: Maximum number of parallel executions
+            deps: Optional map of spec index -> indices that must finish first
             
         Returns:
             List of ToolResults in the same order as input
         """
         max_parallel = max_parallel or self.max_parallel_tools
         
-        # Create tasks
-        tasks = []
-        for tool_name, args in tool_specs:
-            task = asyncio.create_task(
-                self.execute_tool_optimized(tool_name, args)
+        if deps:
+            results = await self._execute_tools_by_dependency(
+                tool_specs, deps, max_parallel
             )
-            tasks.append(task)
-            self.active_executions.add(task)
-        
-        # Execute with concurrency limit
-        results = []
-        for i in range(0, len(tasks), max_parallel):
-            batch = tasks[i:i + max_parallel]
-            batch_results = await asyncio.gather(*batch, return_exceptions=True)
-            results.extend(batch_results)
-            
-            # Remove completed tasks
-            for task in batch:
-                self.active_executions.discard(task)
+            PrintStyle(font_color="green").print(
+                f"Executed {len(tool_specs)} tools in dependency order"
+            )
+            return results
+        
+        # Each finished tool frees its slot for the next one immediately
+        semaphore = asyncio.Semaphore(max_parallel)
+        
+        async def run(spec: Tuple) -> Any:
+            async with semaphore:
+                try:
+                    return await self._execute_spec(spec)
+                except Exception as e:
+                    return e
+        
+        # The task group owns the tasks: cancelling the caller cancels them all
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(run(spec)) for spec in tool_specs]
+        results = [task.result() for task in tasks]
         
         PrintStyle(font_color="green").print(
             f"Executed {len(tool_specs)} tools in parallel"
@@ -475,6 +631,74 @@ class ToolOptimizer:
         
         return results
     
+    async def _execute_tools_by_dependency(
+        self,
+        tool_specs: List[Tuple],
+        deps: Dict[int, Set[int]],
+        max_parallel: int,
+    ) -> List[ToolResult]:
+        """
+        Run tool specs as soon as their prerequisites finish, at most
+        max_parallel at a time. A spec whose prerequisite failed is skipped.
+        
+        Raises:
+            ValueError: If deps reference an unknown index or form a cycle
+        """
+        count = len(tool_specs)
+        graph: Dict[int, Set[int]] = {index: set() for index in range(count)}
+        for index, prerequisites in deps.items():
+            unknown = [i for i in (index, *prerequisites) if not 0 <= i < count]
+            if unknown:
+                raise ValueError(f"Unknown tool spec index in deps: {unknown[0]}")
+            graph[index].update(prerequisites)
+        
+        sorter = graphlib.TopologicalSorter(graph)
+        try:
+            sorter.prepare()
+        except graphlib.CycleError as e:
+            raise ValueError(f"Circular tool dependency: {e.args[1]}") from e
+        
+        semaphore = asyncio.Semaphore(max_parallel)
+        results: List[Any] = [None] * count
+        
+        async def run(index: int) -> int:
+            failed = [i for i in graph[index] if not getattr(results[i], "success", False)]
+            if failed:
+                results[index] = ToolResult(
+                    result=None,
+                    success=False,
+                    execution_time=0.0,
+                    metadata={"skipped": f"dependency {failed[0]} failed"},
+                )
+                return index
+            
+            async with semaphore:
+                try:
+                    results[index] = await self._execute_spec(tool_specs[index])
+                except Exception as e:
+                    results[index] = e
+            return index
+        
+        pending: Set[asyncio.Task] = set()
+        async with asyncio.TaskGroup() as group:
+            while sorter.is_active():
+                for index in sorter.get_ready():
+                    pending.add(group.create_task(run(index)))
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    sorter.done(task.result())
+        
+        return results
+    
+    async def _execute_spec(self, spec: Tuple) -> ToolResult:
+        """Execute one (tool_name, args[, declared_resources]) spec"""
+        tool_name, args, *rest = spec
+        return await self.execute_tool_optimized(
+            tool_name, args, declared_resources=rest[0] if rest else None
+        )
+    
     async def create_tool_pipeline(
         self,
         pipeline: List[Tuple[str, Dict[str, Any], Optional[Callable]]],
@@ -522,7 +746,24 @@ class ToolOptimizer:
                 tool_name=execution.tool_name
             )
         
-        self.metrics[execution.tool_name].update(execution)
+        metrics = self.metrics[execution.tool_name]
+        metrics.update(execution)
+        
+        row = self._metric_rows.get(metrics.tool_name)
+        if row is None:
+            row = len(self._metric_names)
+            if row == self._metric_columns.shape[1]:
+                self._metric_columns = np.concatenate(
+                    (self._metric_columns, np.zeros_like(self._metric_columns)), axis=1
+                )
+            self._metric_rows[metrics.tool_name] = row
+            self._metric_names.append(metrics.tool_name)
+        self._metric_columns[:, row] = (
+            metrics.success_rate,
+            metrics.last_used,
+            metrics.average_execution_time,
+            metrics.total_calls,
+        )
     
     def get_tool_recommendations(
         self,
@@ -539,36 +780,34 @@ class ToolOptimizer:
         Returns:
             List of (tool_name, score) tuples
         """
-        scores = []
+        count = len(self._metric_names)
+        if count == 0 or top_k <= 0:
+            return []
         
-        for tool_name, metrics in self.metrics.items():
-            score = 0.0
-            
-            # Success rate component
-            score += metrics.success_rate * 0.4
-            
-            # Recent usage component
-            if metrics.last_used:
-                age_days = (datetime.now(timezone.utc) - metrics.last_used).days
-                recency_score = max(0, 1.0 - (age_days / 30))
-                score += recency_score * 0.2
-            
-            # Performance component (faster is better)
-            if metrics.average_execution_time > 0:
-                # Normalize to 0-1 (assuming max 10s)
-                perf_score = max(0, 1.0 - (metrics.average_execution_time / 10.0))
-                score += perf_score * 0.2
-            
-            # Usage frequency component
-            freq_score = min(1.0, metrics.total_calls / 100)
-            score += freq_score * 0.2
-            
-            scores.append((tool_name, score))
+        success_rate, last_used, avg_time, total_calls = self._metric_columns[:, :count]
         
-        # Sort by score
-        scores.sort(key=lambda x: x[1], reverse=True)
+        # Success rate component
+        scores = success_rate * 0.4
+        
+        # Recent usage component
+        age_days = np.floor((time.time() - last_used) / 86400)
+        scores += np.maximum(0.0, 1.0 - age_days / 30) * 0.2
+        
+        # Performance component (faster is better, normalized assuming max 10s)
+        perf_score = np.maximum(0.0, 1.0 - avg_time / 10.0)
+        scores += np.where(avg_time > 0, perf_score, 0.0) * 0.2
+        
+        # Usage frequency component
+        scores += np.minimum(1.0, total_calls / 100) * 0.2
+        
+        # Top k without a full sort, then order them by score
+        if top_k < count:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(count)
+        top = top[np.lexsort((top, -scores[top]))]
         
-        return scores[:top_k]
+        return [(self._metric_names[i], float(scores[i])) for i in top]
     
     def get_optimization_stats(self) -> Dict[str, Any]:
         """Get comprehensive optimization statistics"""
@@ -604,7 +843,10 @@ class ToolOptimizer:
                         "average_execution_time": m.average_execution_time,
                         "success_rate": m.success_rate,
                         "cache_hit_rate": m.cache_hit_rate,
-                        "last_used": m.last_used.isoformat() if m.last_used else None,
+                        "last_used": (
+                            datetime.fromtimestamp(m.last_used, timezone.utc).isoformat()
+                            if m.last_used else None
+                        ),
                     }
                     for name, m in self.metrics.items()
                 },
@@ -97,8 +97,8 @@ class VectorDB:
                     break
         return result
 
-    async def insert_documents(self, docs: list[Document]):
-        ids = [str(uuid.uuid4()) for _ in range(len(docs))]
+    async def insert_documents(self, docs: list[Document], ids: list[str] | None = None):
+        ids = ids or [str(uuid.uuid4()) for _ in range(len(docs))]
 
         if ids:
             for doc, id in zip(docs, ids):
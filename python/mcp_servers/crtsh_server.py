@@ -7,10 +7,13 @@ Provides certificate transparency log search for subdomain enumeration and SSL c
 
 import asyncio
 import json
-import requests
-from typing import Any, Dict, List
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 import sys
 
+import httpx  # installed with the mcp package
+
 try:
     from mcp.server import Server
     from mcp.types import Tool, TextContent
@@ -18,45 +21,129 @@ except ImportError:
     print("Error: mcp package not installed. Install with: pip install mcp", file=sys.stderr)
     sys.exit(1)
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# CT logs grow slowly and issued certificates never change
+SEARCH_CACHE_TTL = 3600
+DETAILS_CACHE_TTL = 7 * 24 * 3600
+CACHE_MAXSIZE = 256
+
+# Concurrent crt.sh requests, to stay within its rate limits
+MAX_CONCURRENT_SEARCHES = 10
+
+
+class _AsyncByteReader:
+    """Async file-like view of an httpx byte stream, as ijson expects"""
+    
+    def __init__(self, chunks):
+        self._chunks = chunks.__aiter__()
+    
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes the stream type with read(0)
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
 
 class CertificateTransparency:
     """Certificate Transparency Log Search"""
     
     def __init__(self):
         self.base_url = "https://crt.sh"
+        # Shared pooled client so lookups never block the event loop
+        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=30)
+        # (kind, key) -> (expires_at, result), in LRU order
+        self._cache: OrderedDict[tuple, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._search_slots = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    
+    def _cached(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached result, dropping it if expired"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.monotonic() > expires_at:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+    
+    def _store(self, key: tuple, result: Dict[str, Any], ttl: float):
+        """Cache a successful result"""
+        if result.get("status") != "success":
+            return
+        self._cache[key] = (time.monotonic() + ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_MAXSIZE:
+            self._cache.popitem(last=False)
+    
+    async def close(self):
+        """Close the pooled HTTP client"""
+        await self._client.aclose()
     
     async def search_domain(self, domain: str) -> Dict[str, Any]:
         """Search certificate transparency logs for a domain"""
+        key = ("search", domain)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        result = await self._search_domain(domain)
+        self._store(key, result, SEARCH_CACHE_TTL)
+        return result
+    
+    async def search_domains(self, domains: List[str]) -> Dict[str, Any]:
+        """Search certificate transparency logs for several domains concurrently"""
+        domains = list(dict.fromkeys(domains))
+        results = await asyncio.gather(
+            *(self.search_domain(domain) for domain in domains),
+            return_exceptions=True,
+        )
+        return {
+            domain: (
+                {"domain": domain, "error": str(result), "status": "error"}
+                if isinstance(result, BaseException) else result
+            )
+            for domain, result in zip(domains, results)
+        }
+    
+    async def _search_domain(self, domain: str) -> Dict[str, Any]:
+        async with self._search_slots:
+            return await self._fetch_domain(domain)
+    
+    async def _fetch_domain(self, domain: str) -> Dict[str, Any]:
         try:
             params = {"q": f"%.{domain}", "output": "json"}
-            response = requests.get(self.base_url, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                certs = response.json()
-                
-                # Extract unique subdomains
-                subdomains = set()
-                for cert in certs:
-                    name_value = cert.get("name_value", "")
-                    for subdomain in name_value.split("\n"):
-                        subdomain = subdomain.strip()
-                        if subdomain and "*" not in subdomain:
-                            subdomains.add(subdomain)
+            async with self._client.stream("GET", "/", params=params) as response:
+                if response.status_code != 200:
+                    return {
+                        "domain": domain,
+                        "error": f"HTTP {response.status_code}",
+                        "status": "failed"
+                    }
                 
-                return {
-                    "domain": domain,
-                    "certificates_found": len(certs),
-                    "unique_subdomains": sorted(list(subdomains)),
-                    "status": "success"
-                }
-            else:
-                return {
-                    "domain": domain,
-                    "error": f"HTTP {response.status_code}",
-                    "status": "failed"
-                }
+                if IJSON_AVAILABLE:
+                    cert_count, subdomains = await self._stream_subdomains(response)
+                else:
+                    certs = json.loads(await response.aread())
+                    cert_count = len(certs)
+                    subdomains = set()
+                    for cert in certs:
+                        self._add_subdomains(subdomains, cert.get("name_value", ""))
+            
+            return {
+                "domain": domain,
+                "certificates_found": cert_count,
+                "unique_subdomains": sorted(list(subdomains)),
+                "status": "success"
+            }
                 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 "domain": domain,
                 "error": str(e),
@@ -69,11 +156,43 @@ class CertificateTransparency:
                 "status": "error"
             }
     
+    async def _stream_subdomains(self, response: httpx.Response) -> tuple[int, set]:
+        """
+        Count certificates and collect subdomains while the response streams
+        in, so the certificate list is never held in memory.
+        """
+        cert_count = 0
+        subdomains = set()
+        events = ijson.parse_async(_AsyncByteReader(response.aiter_bytes()))
+        async for prefix, event, value in events:
+            if prefix == "item" and event == "start_map":
+                cert_count += 1
+            elif prefix == "item.name_value" and event == "string":
+                self._add_subdomains(subdomains, value)
+        return cert_count, subdomains
+    
+    @staticmethod
+    def _add_subdomains(subdomains: set, name_value: str):
+        """Add the non-wildcard names of a certificate's name_value field"""
+        subdomains.update(
+            name for line in name_value.splitlines()
+            if (name := line.strip()) and "*" not in name
+        )
+    
     async def get_certificate_details(self, cert_id: str) -> Dict[str, Any]:
         """Get detailed information about a specific certificate"""
+        key = ("details", cert_id)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        result = await self._get_certificate_details(cert_id)
+        self._store(key, result, DETAILS_CACHE_TTL)
+        return result
+    
+    async def _get_certificate_details(self, cert_id: str) -> Dict[str, Any]:
         try:
-            url = f"{self.base_url}/?id={cert_id}&output=json"
-            response = requests.get(url, timeout=30)
+            params = {"id": cert_id, "output": "json"}
+            response = await self._client.get("/", params=params)
             
             if response.status_code == 200:
                 return {
@@ -119,6 +238,21 @@ async def list_tools() -> list[Tool]:
                 "required": ["domain"]
             }
         ),
+        Tool(
+            name="search_domains",
+            description="Search certificate transparency logs for several domains at once",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "domains": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Domains to search for (e.g., [\"example.com\", \"example.org\"])"
+                    }
+                },
+                "required": ["domains"]
+            }
+        ),
         Tool(
             name="get_certificate_details",
             description="Get detailed information about a specific certificate",
@@ -144,6 +278,8 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     
     if name == "search_domain":
         result = await ct.search_domain(arguments["domain"])
+    elif name == "search_domains":
+        result = await ct.search_domains(arguments["domains"])
     elif name == "get_certificate_details":
         result = await ct.get_certificate_details(arguments["cert_id"])
     else:
@@ -156,12 +292,15 @@ async def main():
     """Run the crt.sh MCP server"""
     from mcp.server.stdio import stdio_server
     
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        await ct.close()
 
 
 if __name__ == "__main__":
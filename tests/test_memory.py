@@ -0,0 +1,220 @@
+"""
+Tests for the memory vector store
+"""
+
+import ast
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from python.helpers import memory as M
+    from langchain_core.embeddings import Embeddings
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores.utils import DistanceStrategy
+    MEMORY_AVAILABLE = True
+except ImportError:  # agent runtime dependencies are not installed
+    MEMORY_AVAILABLE = False
+    Embeddings = object
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic unit vectors, identical texts embed identically"""
+
+    def _vector(self, text):
+        seed = sum(ord(c) * 31 ** i for i, c in enumerate(text)) % 2 ** 32
+        vector = np.random.default_rng(seed).standard_normal(16).astype("float32")
+        return list(vector / np.linalg.norm(vector))
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def create_db():
+    return M.MyFaiss(
+        embedding_function=HashEmbeddings(),
+        index=M.create_hnsw_index(16),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=M.Memory._cosine_normalizer,
+    )
+
+
+def create_memory():
+    memory = M.Memory(create_db(), memory_subdir="test")
+    memory._save_db = lambda: None  # keep tests off the memory folder
+    return memory
+
+
+@unittest.skipUnless(MEMORY_AVAILABLE, "agent runtime dependencies not installed")
+class TestMemoryDeletion(unittest.TestCase):
+    """Test tombstoned deletes on the HNSW index"""
+
+    def setUp(self):
+        self.memory = create_memory()
+        self.db = self.memory.db
+        self.ids = asyncio.run(
+            self.memory.insert_texts(
+                [f"text {i}" for i in range(40)], [{"n": i} for i in range(40)]
+            )
+        )
+
+    def search(self, query, limit=40, memory=None):
+        memory = memory or self.memory
+        return asyncio.run(memory.search_similarity_threshold(query, limit, 0.0))
+
+    def test_deleted_documents_are_never_returned(self):
+        """Deletes tombstone vectors instead of rebuilding the graph"""
+        asyncio.run(self.memory.delete_documents_by_ids(self.ids[:5]))
+
+        self.assertEqual(self.db.index.ntotal, 40)
+        self.assertEqual(len(self.db.deleted), 5)
+        found = {doc.metadata["n"] for doc in self.search("text 1")}
+        self.assertEqual(found, set(range(5, 40)))
+
+    def test_updated_document_replaces_original(self):
+        """Re-adding an id after delete leaves exactly one live copy"""
+        doc = self.db.get_by_ids(self.ids[10])[0]
+        doc.metadata["n"] = 100
+        asyncio.run(self.memory.update_documents([doc]))
+
+        numbers = [doc.metadata["n"] for doc in self.search("text 10")]
+        self.assertIn(100, numbers)
+        self.assertNotIn(10, numbers)
+        self.assertEqual(len(numbers), 40)
+
+    def test_tombstones_survive_reload(self):
+        """Deleted positions are persisted next to the index"""
+        asyncio.run(self.memory.delete_documents_by_ids(self.ids[:3]))
+        with tempfile.TemporaryDirectory() as folder:
+            self.db.save_local(folder)
+            loaded = M.MyFaiss.load_local(
+                folder,
+                HashEmbeddings(),
+                allow_dangerous_deserialization=True,
+                distance_strategy=DistanceStrategy.COSINE,
+                relevance_score_fn=M.Memory._cosine_normalizer,
+            )
+
+        self.assertEqual(loaded.deleted, self.db.deleted)
+        reloaded = M.Memory(loaded, memory_subdir="test")
+        self.assertEqual(len(self.search("text 1", memory=reloaded)), 37)
+
+    def test_reloaded_db_gets_new_generation(self):
+        """Result caches keyed on the generation never match a reloaded db"""
+        with tempfile.TemporaryDirectory() as folder:
+            self.db.save_local(folder)
+            loaded = M.MyFaiss.load_local(
+                folder, HashEmbeddings(), allow_dangerous_deserialization=True
+            )
+
+        self.assertNotEqual(loaded.generation, self.db.generation)
+        self.assertNotEqual(create_db().generation, self.db.generation)
+
+    def test_many_deletes_compact_the_index(self):
+        """Once tombstones pass the compaction ratio the graph is rebuilt"""
+        asyncio.run(self.memory.delete_documents_by_ids(self.ids[:20]))
+
+        self.assertEqual(self.db.index.ntotal, 20)
+        self.assertEqual(self.db.deleted, frozenset())
+        self.assertEqual(sorted(self.db.index_to_docstore_id), list(range(20)))
+        found = {doc.metadata["n"] for doc in self.search("text 30")}
+        self.assertEqual(found, set(range(20, 40)))
+
+    def test_search_preset_does_not_touch_shared_index(self):
+        """efSearch is passed per call, so concurrent searches cannot race"""
+        ef_search = self.db.index.hnsw.efSearch
+        asyncio.run(self.memory.search_similarity_threshold("text 1", 5, 0.0, preset="accurate"))
+        self.assertEqual(self.db.index.hnsw.efSearch, ef_search)
+
+
+@unittest.skipUnless(MEMORY_AVAILABLE, "agent runtime dependencies not installed")
+class TestMemoryFilters(unittest.TestCase):
+    """Test native FAISS metadata filters against simple_eval"""
+
+    ROWS = [
+        {"area": "main", "n": 1},
+        {"area": "solutions", "n": 2},
+        {"area": "main", "n": 3},
+        {"area": None, "n": 4},
+        {"n": 5},
+        {"area": "fragments"},
+        {},
+    ]
+
+    def setUp(self):
+        # simple_eval failures on missing fields are reported per document
+        silence = patch.object(M.PrintStyle, "error")
+        silence.start()
+        self.addCleanup(silence.stop)
+
+    def assert_filters_agree(self, condition):
+        native = M.Memory._filter_to_dict(ast.parse(condition, mode="eval").body)
+        self.assertIsNotNone(native, condition)
+        native_filter = M.MyFaiss._create_filter_func(native)
+        evaluated = M.Memory._eval_comparator(condition)
+        for row in self.ROWS:
+            self.assertEqual(native_filter(row), bool(evaluated(row)), f"{condition} on {row}")
+
+    def test_equality(self):
+        self.assert_filters_agree('area == "main"')
+        self.assert_filters_agree('"main" == area')
+        self.assert_filters_agree("n == 2")
+
+    def test_membership(self):
+        self.assert_filters_agree('area in ["main", "solutions"]')
+        self.assert_filters_agree("n in (1, 5)")
+
+    def test_and_or(self):
+        self.assert_filters_agree('area == "main" and n == 3')
+        self.assert_filters_agree('area == "main" or area == "fragments"')
+        self.assert_filters_agree('n == 5 and (area == "main" or area in ["fragments"])')
+
+    def test_missing_metadata_key(self):
+        self.assert_filters_agree("missing == 1")
+        self.assert_filters_agree('missing in ["main"] and area == "main"')
+
+    def test_expressions_that_differ_on_missing_keys_are_not_translated(self):
+        """These keep simple_eval, the dict would match rows it rejects"""
+        for condition in [
+            "n > 3",
+            'area != "main"',
+            "area == None",
+            "area in [None, 'main']",
+            'area == "main" or n == 5',
+            "area ==",
+        ]:
+            comparator = M.Memory._get_comparator(condition)
+            self.assertTrue(callable(comparator), condition)
+
+        comparator = M.Memory._get_comparator("n > 3")
+        self.assertEqual([bool(comparator(row)) for row in self.ROWS], [False, False, False, True, True, False, False])
+
+    def test_filtered_search(self):
+        """Both filter paths return the same documents from a search"""
+        memory = create_memory()
+        asyncio.run(memory.insert_texts([f"text {i}" for i in range(10)], [{"n": i} for i in range(10)]))
+
+        def search(condition):
+            docs = asyncio.run(memory.search_similarity_threshold("text 1", 10, 0.0, filter=condition))
+            return sorted(doc.metadata["n"] for doc in docs)
+
+        self.assertEqual(search("n in [2, 4, 6]"), [2, 4, 6])
+        self.assertEqual(search("n == 2 or n == 4 or n == 6"), [2, 4, 6])
+        self.assertEqual(search("n % 2 == 0 and n > 0 and n < 7"), [2, 4, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests for the multi-agent coordinator
+"""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from python.helpers import multi_agent_coordinator as mac
+    COORDINATOR_AVAILABLE = True
+except ImportError:  # agent runtime dependencies are not installed
+    COORDINATOR_AVAILABLE = False
+
+
+class FakeAgent:
+    """Stands in for Agent: counts monologue runs instead of calling a model"""
+
+    DATA_NAME_SUPERIOR = "_superior"
+    DATA_NAME_SUBORDINATE = "_subordinate"
+    runs = 0
+    created = 0
+    messages = []
+
+    def __init__(self, number, config, context=None):
+        FakeAgent.created += 1
+        self.number = number
+        self.config = config
+        self.context = context
+        self.data = {}
+        self.history = None
+        self.last_user_message = None
+        self.intervention = None
+
+    def hist_add_user_message(self, message):
+        self.last_user_message = message
+
+    async def monologue(self):
+        FakeAgent.runs += 1
+        FakeAgent.messages.append(self.last_user_message.message)
+        if self.last_user_message.message.startswith("fail"):
+            raise RuntimeError(self.last_user_message.message)
+        return f"{self.context.id}:{self.last_user_message.message}"
+
+
+def fake_profile_config(profile):
+    return SimpleNamespace(profile=profile), ("config", profile)
+
+
+def patch_agent_runtime(test):
+    """Swap agent construction for FakeAgent for the duration of a test"""
+    patches = [
+        patch.object(mac, "Agent", FakeAgent),
+        patch.object(mac, "UserMessage", lambda message, attachments: SimpleNamespace(message=message)),
+        patch.object(mac, "history", SimpleNamespace(History=lambda agent: None)),
+        patch.object(mac, "_get_profile_config", fake_profile_config),
+    ]
+    for p in patches:
+        p.start()
+        test.addCleanup(p.stop)
+    mac.MultiAgentCoordinator.clear_pool()
+    mac.MultiAgentCoordinator.clear_result_cache()
+    FakeAgent.runs = 0
+    FakeAgent.created = 0
+    FakeAgent.messages = []
+
+
+@unittest.skipUnless(COORDINATOR_AVAILABLE, "agent runtime dependencies not installed")
+class TestCoordinatorCaching(unittest.TestCase):
+    """Test result caching and agent pooling across contexts"""
+
+    def setUp(self):
+        patch_agent_runtime(self)
+
+    def coordinator(self, context_id):
+        return mac.MultiAgentCoordinator(SimpleNamespace(id=context_id))
+
+    def test_tasks_are_not_cached_by_default(self):
+        """Identical tasks are re-run unless caching is requested"""
+        coordinator = self.coordinator("ctx1")
+        task = mac.AgentTask("developer", "Develop: write the file")
+        asyncio.run(coordinator.execute_task("developer_0", task))
+        asyncio.run(coordinator.execute_task("developer_0", task))
+        self.assertEqual(FakeAgent.runs, 2)
+
+    def test_contexts_do_not_share_cached_results(self):
+        """A cached result is only reused inside the context that produced it"""
+        task = mac.AgentTask("researcher", "Research: topic", cache=True)
+        first = asyncio.run(self.coordinator("ctx1").execute_task("researcher_0", task))
+        again = asyncio.run(self.coordinator("ctx1").execute_task("researcher_0", task))
+        other = asyncio.run(self.coordinator("ctx2").execute_task("researcher_0", task))
+
+        self.assertEqual(first, "ctx1:Research: topic")
+        self.assertEqual(again, first)
+        self.assertEqual(other, "ctx2:Research: topic")
+        self.assertEqual(FakeAgent.runs, 2)
+
+    def test_pooled_agents_stay_in_their_context(self):
+        """Idle agents are reused within a context but never handed to another"""
+        task = mac.AgentTask("developer", "Develop: feature")
+        asyncio.run(self.coordinator("ctx1").execute_task("developer_0", task))
+        asyncio.run(self.coordinator("ctx2").execute_task("developer_0", task))
+        self.assertEqual(FakeAgent.created, 2)
+
+        asyncio.run(self.coordinator("ctx1").execute_task("developer_0", task))
+        self.assertEqual(FakeAgent.created, 2)
+
+    def test_failed_agent_is_not_pooled(self):
+        """An agent whose monologue raised is dropped instead of reused"""
+        coordinator = self.coordinator("ctx1")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(coordinator.execute_task("developer_0", mac.AgentTask("developer", "fail")))
+        self.assertEqual(coordinator.agents, {})
+        self.assertEqual(mac.MultiAgentCoordinator._AGENT_POOL, {})
+
+        asyncio.run(coordinator.execute_task("developer_0", mac.AgentTask("developer", "retry")))
+        self.assertEqual(FakeAgent.created, 2)
+
+    def test_parallel_failures_are_all_reported(self):
+        """The first failure is raised with the other failures attached as notes"""
+        coordinator = self.coordinator("ctx1")
+        tasks = [mac.AgentTask("developer", "fail one"), mac.AgentTask("analyst", "fail two")]
+        with self.assertLogs(mac.logger, "WARNING"):
+            with self.assertRaises(RuntimeError) as raised:
+                asyncio.run(coordinator.execute_parallel(tasks))
+
+        self.assertEqual(str(raised.exception), "fail one")
+        self.assertIn("fail two", "\n".join(raised.exception.__notes__))
+
+
+
+@unittest.skipUnless(COORDINATOR_AVAILABLE, "agent runtime dependencies not installed")
+class TestDependencyWaves(unittest.TestCase):
+    """Test dependency ordering of adaptive execution"""
+
+    def setUp(self):
+        patch_agent_runtime(self)
+
+    def tasks(self, *depends_on):
+        return [
+            mac.AgentTask("developer", f"Develop: part {i}", depends_on=tuple(deps))
+            for i, deps in enumerate(depends_on)
+        ]
+
+    def waves(self, tasks):
+        agent_ids = [f"developer_{i}" for i in range(len(tasks))]
+        return mac._dependency_waves(agent_ids, tasks)
+
+    def test_independent_tasks_share_one_wave(self):
+        self.assertEqual(self.waves(self.tasks([], [], [])), [[0, 1, 2]])
+
+    def test_diamond_dependencies(self):
+        """A task waits for every dependency, duplicates count once"""
+        tasks = self.tasks(
+            [],
+            ["developer_0"],
+            ["developer_0", "developer_0"],
+            ["developer_1", "developer_2"],
+        )
+        self.assertEqual(self.waves(tasks), [[0], [1, 2], [3]])
+
+    def test_unequal_chains(self):
+        tasks = self.tasks(["developer_1"], ["developer_2"], [], [])
+        self.assertEqual(self.waves(tasks), [[2, 3], [1], [0]])
+
+    def test_unknown_dependency(self):
+        with self.assertRaisesRegex(ValueError, "unknown task developer_9"):
+            self.waves(self.tasks([], ["developer_9"]))
+
+    def test_cycle(self):
+        tasks = self.tasks([], ["developer_2"], ["developer_1"], ["developer_0"])
+        with self.assertRaisesRegex(ValueError, "cycle: developer_1, developer_2"):
+            self.waves(tasks)
+
+    def test_self_dependency_is_a_cycle(self):
+        with self.assertRaises(ValueError):
+            self.waves(self.tasks(["developer_0"]))
+
+    def test_adaptive_execution_follows_waves(self):
+        """Dependents only start after the waves before them finished"""
+        coordinator = mac.MultiAgentCoordinator(SimpleNamespace(id="ctx1"))
+        results = asyncio.run(coordinator.execute_adaptive(self.tasks(["developer_1"], [])))
+
+        self.assertEqual(FakeAgent.messages, ["Develop: part 1", "Develop: part 0"])
+        self.assertEqual(set(results), {"developer_0", "developer_1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+"""
+Tests for the tool optimizer
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from python.helpers import tool_optimizer as to
+
+
+class FakeResponse:
+    def __init__(self, message):
+        self.message = message
+
+
+class FakeTool:
+    """Records when it runs and how many tools run at the same time"""
+
+    def __init__(self, agent, name):
+        self.agent = agent
+        self.name = name
+
+    async def execute(self, i, delay=0.0, fail=False):
+        agent = self.agent
+        agent.log.append(("start", i))
+        agent.running += 1
+        agent.max_running = max(agent.max_running, agent.running)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            agent.running -= 1
+            agent.log.append(("end", i))
+        if fail:
+            raise RuntimeError(f"tool {i} failed")
+        return FakeResponse(f"{self.name}:{i}")
+
+
+class FakeAgent:
+    def __init__(self):
+        self.log = []
+        self.running = 0
+        self.max_running = 0
+
+    def get_tool(self, name, method, args, message, loop_data):
+        return FakeTool(self, name)
+
+    def started(self, i):
+        return self.log.index(("start", i))
+
+    def ended(self, i):
+        return self.log.index(("end", i))
+
+
+def spec(i, **args):
+    return ("tool", {"i": i, **args}, [to.NO_RESOURCES])
+
+
+class TestDependencyScheduling(unittest.TestCase):
+    """Test dependency-aware scheduling of parallel tool specs"""
+
+    def setUp(self):
+        self.agent = FakeAgent()
+        self.optimizer = to.ToolOptimizer(self.agent)
+
+    def run_specs(self, specs, deps, max_parallel=None):
+        return asyncio.run(
+            self.optimizer.execute_tools_parallel(specs, max_parallel=max_parallel, deps=deps)
+        )
+
+    def test_dependents_start_after_their_prerequisites(self):
+        """Independent specs start at once, dependents as soon as theirs finish"""
+        specs = [spec(0, delay=0.02), spec(1), spec(2), spec(3, delay=0.02)]
+        results = self.run_specs(specs, {2: {0, 1}})
+
+        self.assertEqual([r.result for r in results], ["tool:0", "tool:1", "tool:2", "tool:3"])
+        self.assertGreater(self.agent.started(2), self.agent.ended(0))
+        self.assertGreater(self.agent.started(2), self.agent.ended(1))
+        self.assertLess(self.agent.started(3), self.agent.ended(0))
+
+    def test_dependents_of_failed_tool_are_skipped(self):
+        specs = [spec(0, fail=True), spec(1), spec(2), spec(3)]
+        results = self.run_specs(specs, {1: {0}, 2: {1}})
+
+        self.assertEqual([r.success for r in results], [False, False, False, True])
+        self.assertEqual(results[1].metadata, {"skipped": "dependency 0 failed"})
+        self.assertEqual(results[2].metadata, {"skipped": "dependency 1 failed"})
+        self.assertNotIn(("start", 1), self.agent.log)
+        self.assertNotIn(("start", 2), self.agent.log)
+
+    def test_max_parallel_applies_to_ready_specs(self):
+        specs = [spec(i, delay=0.01) for i in range(6)]
+        self.run_specs(specs, {5: {0}}, max_parallel=2)
+        self.assertEqual(self.agent.max_running, 2)
+
+    def test_unknown_index(self):
+        with self.assertRaisesRegex(ValueError, "Unknown tool spec index in deps: 7"):
+            self.run_specs([spec(0), spec(1)], {1: {7}})
+        self.assertEqual(self.agent.log, [])
+
+    def test_cycle(self):
+        with self.assertRaisesRegex(ValueError, "Circular tool dependency"):
+            self.run_specs([spec(0), spec(1), spec(2)], {0: {2}, 1: {0}, 2: {1}})
+        self.assertEqual(self.agent.log, [])
+
+
+class TestResourceLocks(unittest.TestCase):
+    """Test per-resource locking of concurrently running tools"""
+
+    def setUp(self):
+        self.agent = FakeAgent()
+        self.optimizer = to.ToolOptimizer(self.agent)
+
+    def run_specs(self, specs):
+        return asyncio.run(
+            asyncio.wait_for(self.optimizer.execute_tools_parallel(specs), timeout=5)
+        )
+
+    def test_shared_resource_runs_one_at_a_time(self):
+        self.run_specs([("tool", {"i": i, "delay": 0.01}, ["/a.txt"]) for i in range(3)])
+        self.assertEqual(self.agent.max_running, 1)
+
+    def test_distinct_resources_run_together(self):
+        self.run_specs([("tool", {"i": i, "delay": 0.01}, [f"/{i}.txt"]) for i in range(3)])
+        self.assertEqual(self.agent.max_running, 3)
+
+    def test_undeclared_resources_lock_the_tool(self):
+        self.run_specs([("tool", {"i": i, "delay": 0.01}) for i in range(3)])
+        self.assertEqual(self.agent.max_running, 1)
+
+    def test_no_resources_skips_locking(self):
+        self.run_specs([spec(i, delay=0.01) for i in range(3)])
+        self.assertEqual(self.agent.max_running, 3)
+
+    def test_overlapping_resources_do_not_deadlock(self):
+        """Locks are taken in sorted order whatever order they are declared in"""
+        resources = [["/a", "/b"], ["/b", "/a"], ["/b", "/c"], ["/c", "/a"]]
+        results = self.run_specs(
+            [("tool", {"i": i, "delay": 0.01}, r) for i, r in enumerate(resources)]
+        )
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual(self.agent.max_running, 1)
+
+    def test_locks_are_dropped_when_unused(self):
+        specs = [("tool", {"i": i, "fail": i == 1}, ["/a.txt", f"/{i}.txt"]) for i in range(3)]
+        self.run_specs(specs)
+        self.assertEqual(len(self.optimizer.resource_locks), 0)
+
+    def test_cancelled_waiters_release_their_locks(self):
+        locks = to.ResourceLockManager()
+
+        async def main():
+            async with locks.acquire(["/a.txt"]):
+                waiter = asyncio.create_task(self.hold(locks, ["/a.txt", "/b.txt"]))
+                await asyncio.sleep(0)
+                self.assertEqual(len(locks), 2)
+                waiter.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await waiter
+            self.assertEqual(len(locks), 0)
+
+        asyncio.run(main())
+
+    @staticmethod
+    async def hold(locks, resources):
+        async with locks.acquire(resources):
+            await asyncio.sleep(1)
+
+
+class TestCacheInvalidation(unittest.TestCase):
+    """Test per tool, pattern and resource invalidation of the tool cache"""
+
+    def setUp(self):
+        self.cache = to.ToolCache()
+        self.cache.put("search_web", {"q": "a"}, "web a")
+        self.cache.put("search_web", {"q": "b"}, "web b")
+        self.cache.put("search_docs", {"q": "a"}, "docs a", resources=["/docs"])
+        self.cache.put("read_file", {"path": "/x"}, "x", resources=["/x"])
+        self.cache.put("read_file", {"path": "/y"}, "y", resources=["/y", "/docs"])
+
+    def cached(self):
+        return sorted(entry.result for entry in self.cache.cache.values())
+
+    def test_invalidate_tool(self):
+        self.assertEqual(self.cache.invalidate(tool_name="search_web"), 2)
+        self.assertEqual(self.cached(), ["docs a", "x", "y"])
+        self.assertNotIn("search_web", self.cache.tool_to_keys)
+
+    def test_invalidate_pattern(self):
+        self.assertEqual(self.cache.invalidate(pattern="search_*"), 3)
+        self.assertEqual(self.cached(), ["x", "y"])
+        self.assertEqual(set(self.cache.resource_to_keys), {"/x", "/y", "/docs"})
+
+    def test_invalidate_everything(self):
+        self.assertEqual(self.cache.invalidate(), 5)
+        self.assertEqual(self.cached(), [])
+        self.assertEqual(self.cache.tool_to_keys, {})
+        self.assertEqual(self.cache.resource_to_keys, {})
+
+    def test_invalidate_unknown_tool(self):
+        self.assertEqual(self.cache.invalidate(tool_name="missing"), 0)
+        self.assertEqual(len(self.cached()), 5)
+
+    def test_invalidate_by_dependency(self):
+        self.assertEqual(self.cache.invalidate_by_dependency("/docs"), 2)
+        self.assertEqual(self.cached(), ["web a", "web b", "x"])
+        self.assertEqual(set(self.cache.resource_to_keys), {"/x"})
+        self.assertEqual(self.cache.invalidate_by_dependency("/docs"), 0)
+
+    def test_eviction_cleans_indexes(self):
+        cache = to.ToolCache(max_size=2)
+        cache.put("read_file", {"path": "/x"}, "x", resources=["/x"])
+        cache.put("read_file", {"path": "/x"}, "x again", resources=["/x"])
+        cache.put("search_web", {"q": "a"}, "web a")
+        cache.put("search_web", {"q": "b"}, "web b")
+
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertEqual(dict(cache.tool_to_keys), {"search_web": set(cache.cache)})
+        self.assertEqual(cache.resource_to_keys, {})
+
+    def test_written_resource_forces_rerun(self):
+        agent = FakeAgent()
+        optimizer = to.ToolOptimizer(agent)
+
+        def read():
+            return asyncio.run(
+                optimizer.execute_tool_optimized("read_file", {"i": 0}, declared_resources=["/x"])
+            )
+
+        self.assertFalse(read().cached)
+        self.assertTrue(read().cached)
+        optimizer.cache.invalidate_by_dependency("/x")
+        self.assertFalse(read().cached)
+        self.assertEqual(agent.log.count(("start", 0)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()